@@ -24,33 +24,53 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0c\x63rypto.proto\x12\x0erpc_info.proto\"\xb4\x02\n\x06\x43rypto\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0e\n\x06symbol\x18\x02 \x01(\t\x12\x0c\n\x04name\x18\x03 \x01(\t\x12\r\n\x05image\x18\x04 \x01(\t\x12\x15\n\rcurrent_price\x18\x05 \x01(\x01\x12\x12\n\nmarket_cap\x18\x06 \x01(\x03\x12\x17\n\x0fmarket_cap_rank\x18\x07 \x01(\x05\x12\x1f\n\x17\x66ully_diluted_valuation\x18\x08 \x01(\x03\x12\x14\n\x0ctotal_volume\x18\t \x01(\x03\x12\x10\n\x08high_24h\x18\n \x01(\x01\x12\x0f\n\x07low_24h\x18\x0b \x01(\x01\x12\x18\n\x10price_change_24h\x18\x0c \x01(\x01\x12#\n\x1bprice_change_percentage_24h\x18\r \x01(\x01\x12\x14\n\x0clast_updated\x18\x0e \x01(\t\"8\n\x14HistoricalPricePoint\x12\x11\n\ttimestamp\x18\x01 \x01(\x03\x12\r\n\x05price\x18\x02 \x01(\x01\"3\n\rCryptoRequest\x12\x10\n\x08\x63urrency\x18\x01 \x01(\t\x12\x10\n\x08quantity\x18\x02 \x01(\x05\"G\n\x11HistoricalRequest\x12\n\n\x02id\x18\x01 \x01(\t\x12\x10\n\x08\x63urrency\x18\x02 \x01(\t\x12\x14\n\x0chistory_size\x18\x03 \x01(\x05\"V\n\x12HistoricalResponse\x12\n\n\x02id\x18\x01 \x01(\t\x12\x34\n\x06prices\x18\x02 \x03(\x0b\x32$.rpc_info.proto.HistoricalPricePoint\"5\n\nCryptoList\x12\'\n\x07\x63ryptos\x18\x01 \x03(\x0b\x32\x16.rpc_info.proto.Crypto\"1\n\x11\x43ryptoByIdRequest\x12\n\n\x02id\x18\x01 \x01(\t\x12\x10\n\x08\x63urrency\x18\x02 \x01(\t\".\n\x0c\x45xchangeRate\x12\x10\n\x08\x63urrency\x18\x01 \x01(\t\x12\x0c\n\x04rate\x18\x02 \x01(\x01\"<\n\rExchangeRates\x12+\n\x05rates\x18\x01 \x03(\x0b\x32\x1c.rpc_info.proto.ExchangeRate\"\x07\n\x05\x45mpty2\x9c\x03\n\rCryptoService\x12J\n\rGetTopCryptos\x12\x1d.rpc_info.proto.CryptoRequest\x1a\x1a.rpc_info.proto.CryptoList\x12J\n\rGetCryptoById\x12!.rpc_info.proto.CryptoByIdRequest\x1a\x16.rpc_info.proto.Crypto\x12X\n\x0fGetPriceHistory\x12!.rpc_info.proto.HistoricalRequest\x1a\".rpc_info.proto.HistoricalResponse\x12O\n\x10StreamTopCryptos\x12\x1d.rpc_info.proto.CryptoRequest\x1a\x1a.rpc_info.proto.CryptoList0\x01\x12H\n\x10GetExchangeRates\x12\x15.rpc_info.proto.Empty\x1a\x1d.rpc_info.proto.ExchangeRatesb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0c\x63rypto.proto\x12\x0erpc_info.proto\"\xb4\x02\n\x06\x43rypto\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0e\n\x06symbol\x18\x02 \x01(\t\x12\x0c\n\x04name\x18\x03 \x01(\t\x12\r\n\x05image\x18\x04 \x01(\t\x12\x15\n\rcurrent_price\x18\x05 \x01(\x01\x12\x12\n\nmarket_cap\x18\x06 \x01(\x03\x12\x17\n\x0fmarket_cap_rank\x18\x07 \x01(\x05\x12\x1f\n\x17\x66ully_diluted_valuation\x18\x08 \x01(\x03\x12\x14\n\x0ctotal_volume\x18\t \x01(\x03\x12\x10\n\x08high_24h\x18\n \x01(\x01\x12\x0f\n\x07low_24h\x18\x0b \x01(\x01\x12\x18\n\x10price_change_24h\x18\x0c \x01(\x01\x12#\n\x1bprice_change_percentage_24h\x18\r \x01(\x01\x12\x14\n\x0clast_updated\x18\x0e \x01(\t\"\xd9\x04\n\x0b\x43ryptoDelta\x12\n\n\x02id\x18\x01 \x01(\t\x12\x13\n\x06symbol\x18\x02 \x01(\tH\x00\x88\x01\x01\x12\x11\n\x04name\x18\x03 \x01(\tH\x01\x88\x01\x01\x12\x12\n\x05image\x18\x04 \x01(\tH\x02\x88\x01\x01\x12\x1a\n\rcurrent_price\x18\x05 \x01(\x01H\x03\x88\x01\x01\x12\x17\n\nmarket_cap\x18\x06 \x01(\x03H\x04\x88\x01\x01\x12\x1c\n\x0fmarket_cap_rank\x18\x07 \x01(\x05H\x05\x88\x01\x01\x12$\n\x17\x66ully_diluted_valuation\x18\x08 \x01(\x03H\x06\x88\x01\x01\x12\x19\n\x0ctotal_volume\x18\t \x01(\x03H\x07\x88\x01\x01\x12\x15\n\x08high_24h\x18\n \x01(\x01H\x08\x88\x01\x01\x12\x14\n\x07low_24h\x18\x0b \x01(\x01H\t\x88\x01\x01\x12\x1d\n\x10price_change_24h\x18\x0c \x01(\x01H\n\x88\x01\x01\x12(\n\x1bprice_change_percentage_24h\x18\r \x01(\x01H\x0b\x88\x01\x01\x12\x19\n\x0clast_updated\x18\x0e \x01(\tH\x0c\x88\x01\x01\x42\t\n\x07_symbolB\x07\n\x05_nameB\x08\n\x06_imageB\x10\n\x0e_current_priceB\r\n\x0b_market_capB\x12\n\x10_market_cap_rankB\x1a\n\x18_fully_diluted_valuationB\x0f\n\r_total_volumeB\x0b\n\t_high_24hB\n\n\x08_low_24hB\x13\n\x11_price_change_24hB\x1e\n\x1c_price_change_percentage_24hB\x0f\n\r_last_updated\"\x80\x01\n\x0c\x43ryptoUpdate\x12\x10\n\x08sequence\x18\x01 \x01(\x04\x12\x10\n\x08snapshot\x18\x02 \x01(\x08\x12,\n\x07\x63ryptos\x18\x03 \x03(\x0b\x32\x1b.rpc_info.proto.CryptoDelta\x12\x0f\n\x07removed\x18\x04 \x03(\t\x12\r\n\x05order\x18\x05 \x03(\t\"8\n\x14HistoricalPricePoint\x12\x11\n\ttimestamp\x18\x01 \x01(\x03\x12\r\n\x05price\x18\x02 \x01(\x01\"3\n\rCryptoRequest\x12\x10\n\x08\x63urrency\x18\x01 \x01(\t\x12\x10\n\x08quantity\x18\x02 \x01(\x05\"v\n\x11HistoricalRequest\x12\n\n\x02id\x18\x01 \x01(\t\x12\x10\n\x08\x63urrency\x18\x02 \x01(\t\x12\x14\n\x0chistory_size\x18\x03 \x01(\x05\x12-\n\x06\x66ormat\x18\x04 \x01(\x0e\x32\x1d.rpc_info.proto.HistoryFormat\"\x95\x01\n\x16HistoricalRangeRequest\x12\n\n\x02id\x18\x01 \x01(\t\x12\x10\n\x08\x63urrency\x18\x02 \x01(\t\x12\r\n\x05start\x18\x03 \x01(\x03\x12\x0b\n\x03\x65nd\x18\x04 \x01(\x03\x12\x12\n\nmax_points\x18\x05 \x01(\x05\x12-\n\x06\x66ormat\x18\x06 \x01(\x0e\x32\x1d.rpc_info.proto.HistoryFormat\"\x96\x01\n\x17HistoricalStreamRequest\x12\n\n\x02id\x18\x01 \x01(\t\x12\x10\n\x08\x63urrency\x18\x02 \x01(\t\x12\r\n\x05start\x18\x03 \x01(\x03\x12\x0b\n\x03\x65nd\x18\x04 \x01(\x03\x12\x12\n\nchunk_size\x18\x05 \x01(\x05\x12-\n\x06\x66ormat\x18\x06 \x01(\x0e\x32\x1d.rpc_info.proto.HistoryFormat\"Q\n\x11HistoricalColumns\x12\x12\n\ntimestamps\x18\x01 \x03(\x12\x12\x0e\n\x06prices\x18\x02 \x03(\x01\x12\x18\n\x10\x64\x65lta_timestamps\x18\x03 \x01(\x08\"\x8a\x01\n\x12HistoricalResponse\x12\n\n\x02id\x18\x01 \x01(\t\x12\x34\n\x06prices\x18\x02 \x03(\x0b\x32$.rpc_info.proto.HistoricalPricePoint\x12\x32\n\x07\x63olumns\x18\x03 \x01(\x0b\x32!.rpc_info.proto.HistoricalColumns\"|\n\x16HistoricalBatchRequest\x12\x0b\n\x03ids\x18\x01 \x03(\t\x12\x10\n\x08\x63urrency\x18\x02 \x01(\t\x12\x14\n\x0chistory_size\x18\x03 \x01(\x05\x12-\n\x06\x66ormat\x18\x04 \x01(\x0e\x32\x1d.rpc_info.proto.HistoryFormat\"\xba\x01\n\x17HistoricalBatchResponse\x12I\n\thistories\x18\x01 \x03(\x0b\x32\x36.rpc_info.proto.HistoricalBatchResponse.HistoriesEntry\x1aT\n\x0eHistoriesEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\x31\n\x05value\x18\x02 \x01(\x0b\x32\".rpc_info.proto.HistoricalResponse:\x02\x38\x01\"5\n\nCryptoList\x12\'\n\x07\x63ryptos\x18\x01 \x03(\x0b\x32\x16.rpc_info.proto.Crypto\"1\n\x11\x43ryptoByIdRequest\x12\n\n\x02id\x18\x01 \x01(\t\x12\x10\n\x08\x63urrency\x18\x02 \x01(\t\".\n\x0c\x45xchangeRate\x12\x10\n\x08\x63urrency\x18\x01 \x01(\t\x12\x0c\n\x04rate\x18\x02 \x01(\x01\"<\n\rExchangeRates\x12+\n\x05rates\x18\x01 \x03(\x0b\x32\x1c.rpc_info.proto.ExchangeRate\"\x07\n\x05\x45mpty*S\n\rHistoryFormat\x12\x12\n\x0eHISTORY_POINTS\x10\x00\x12\x13\n\x0fHISTORY_COLUMNS\x10\x01\x12\x19\n\x15HISTORY_COLUMNS_DELTA\x10\x02\x32\xa6\x06\n\rCryptoService\x12J\n\rGetTopCryptos\x12\x1d.rpc_info.proto.CryptoRequest\x1a\x1a.rpc_info.proto.CryptoList\x12J\n\rGetCryptoById\x12!.rpc_info.proto.CryptoByIdRequest\x1a\x16.rpc_info.proto.Crypto\x12X\n\x0fGetPriceHistory\x12!.rpc_info.proto.HistoricalRequest\x1a\".rpc_info.proto.HistoricalResponse\x12\x62\n\x14GetPriceHistoryRange\x12&.rpc_info.proto.HistoricalRangeRequest\x1a\".rpc_info.proto.HistoricalResponse\x12g\n\x14GetPriceHistoryBatch\x12&.rpc_info.proto.HistoricalBatchRequest\x1a\'.rpc_info.proto.HistoricalBatchResponse\x12\x63\n\x12StreamPriceHistory\x12\'.rpc_info.proto.HistoricalStreamRequest\x1a\".rpc_info.proto.HistoricalResponse0\x01\x12O\n\x10StreamTopCryptos\x12\x1d.rpc_info.proto.CryptoRequest\x1a\x1a.rpc_info.proto.CryptoList0\x01\x12V\n\x15StreamTopCryptosDelta\x12\x1d.rpc_info.proto.CryptoRequest\x1a\x1c.rpc_info.proto.CryptoUpdate0\x01\x12H\n\x10GetExchangeRates\x12\x15.rpc_info.proto.Empty\x1a\x1d.rpc_info.proto.ExchangeRatesb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'crypto_pb2', _globals)
 if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
+  _globals['_HISTORICALBATCHRESPONSE_HISTORIESENTRY']._loaded_options = None
+  _globals['_HISTORICALBATCHRESPONSE_HISTORIESENTRY']._serialized_options = b'8\001'
+  _globals['_HISTORYFORMAT']._serialized_start=2378
+  _globals['_HISTORYFORMAT']._serialized_end=2461
   _globals['_CRYPTO']._serialized_start=33
   _globals['_CRYPTO']._serialized_end=341
-  _globals['_HISTORICALPRICEPOINT']._serialized_start=343
-  _globals['_HISTORICALPRICEPOINT']._serialized_end=399
-  _globals['_CRYPTOREQUEST']._serialized_start=401
-  _globals['_CRYPTOREQUEST']._serialized_end=452
-  _globals['_HISTORICALREQUEST']._serialized_start=454
-  _globals['_HISTORICALREQUEST']._serialized_end=525
-  _globals['_HISTORICALRESPONSE']._serialized_start=527
-  _globals['_HISTORICALRESPONSE']._serialized_end=613
-  _globals['_CRYPTOLIST']._serialized_start=615
-  _globals['_CRYPTOLIST']._serialized_end=668
-  _globals['_CRYPTOBYIDREQUEST']._serialized_start=670
-  _globals['_CRYPTOBYIDREQUEST']._serialized_end=719
-  _globals['_EXCHANGERATE']._serialized_start=721
-  _globals['_EXCHANGERATE']._serialized_end=767
-  _globals['_EXCHANGERATES']._serialized_start=769
-  _globals['_EXCHANGERATES']._serialized_end=829
-  _globals['_EMPTY']._serialized_start=831
-  _globals['_EMPTY']._serialized_end=838
-  _globals['_CRYPTOSERVICE']._serialized_start=841
-  _globals['_CRYPTOSERVICE']._serialized_end=1253
+  _globals['_CRYPTODELTA']._serialized_start=344
+  _globals['_CRYPTODELTA']._serialized_end=945
+  _globals['_CRYPTOUPDATE']._serialized_start=948
+  _globals['_CRYPTOUPDATE']._serialized_end=1076
+  _globals['_HISTORICALPRICEPOINT']._serialized_start=1078
+  _globals['_HISTORICALPRICEPOINT']._serialized_end=1134
+  _globals['_CRYPTOREQUEST']._serialized_start=1136
+  _globals['_CRYPTOREQUEST']._serialized_end=1187
+  _globals['_HISTORICALREQUEST']._serialized_start=1189
+  _globals['_HISTORICALREQUEST']._serialized_end=1307
+  _globals['_HISTORICALRANGEREQUEST']._serialized_start=1310
+  _globals['_HISTORICALRANGEREQUEST']._serialized_end=1459
+  _globals['_HISTORICALSTREAMREQUEST']._serialized_start=1462
+  _globals['_HISTORICALSTREAMREQUEST']._serialized_end=1612
+  _globals['_HISTORICALCOLUMNS']._serialized_start=1614
+  _globals['_HISTORICALCOLUMNS']._serialized_end=1695
+  _globals['_HISTORICALRESPONSE']._serialized_start=1698
+  _globals['_HISTORICALRESPONSE']._serialized_end=1836
+  _globals['_HISTORICALBATCHREQUEST']._serialized_start=1838
+  _globals['_HISTORICALBATCHREQUEST']._serialized_end=1962
+  _globals['_HISTORICALBATCHRESPONSE']._serialized_start=1965
+  _globals['_HISTORICALBATCHRESPONSE']._serialized_end=2151
+  _globals['_HISTORICALBATCHRESPONSE_HISTORIESENTRY']._serialized_start=2067
+  _globals['_HISTORICALBATCHRESPONSE_HISTORIESENTRY']._serialized_end=2151
+  _globals['_CRYPTOLIST']._serialized_start=2153
+  _globals['_CRYPTOLIST']._serialized_end=2206
+  _globals['_CRYPTOBYIDREQUEST']._serialized_start=2208
+  _globals['_CRYPTOBYIDREQUEST']._serialized_end=2257
+  _globals['_EXCHANGERATE']._serialized_start=2259
+  _globals['_EXCHANGERATE']._serialized_end=2305
+  _globals['_EXCHANGERATES']._serialized_start=2307
+  _globals['_EXCHANGERATES']._serialized_end=2367
+  _globals['_EMPTY']._serialized_start=2369
+  _globals['_EMPTY']._serialized_end=2376
+  _globals['_CRYPTOSERVICE']._serialized_start=2464
+  _globals['_CRYPTOSERVICE']._serialized_end=3270
 # @@protoc_insertion_point(module_scope)
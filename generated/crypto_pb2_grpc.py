@@ -50,11 +50,31 @@ class CryptoServiceStub(object):
                 request_serializer=crypto__pb2.HistoricalRequest.SerializeToString,
                 response_deserializer=crypto__pb2.HistoricalResponse.FromString,
                 _registered_method=True)
+        self.GetPriceHistoryRange = channel.unary_unary(
+                '/rpc_info.proto.CryptoService/GetPriceHistoryRange',
+                request_serializer=crypto__pb2.HistoricalRangeRequest.SerializeToString,
+                response_deserializer=crypto__pb2.HistoricalResponse.FromString,
+                _registered_method=True)
+        self.GetPriceHistoryBatch = channel.unary_unary(
+                '/rpc_info.proto.CryptoService/GetPriceHistoryBatch',
+                request_serializer=crypto__pb2.HistoricalBatchRequest.SerializeToString,
+                response_deserializer=crypto__pb2.HistoricalBatchResponse.FromString,
+                _registered_method=True)
+        self.StreamPriceHistory = channel.unary_stream(
+                '/rpc_info.proto.CryptoService/StreamPriceHistory',
+                request_serializer=crypto__pb2.HistoricalStreamRequest.SerializeToString,
+                response_deserializer=crypto__pb2.HistoricalResponse.FromString,
+                _registered_method=True)
         self.StreamTopCryptos = channel.unary_stream(
                 '/rpc_info.proto.CryptoService/StreamTopCryptos',
                 request_serializer=crypto__pb2.CryptoRequest.SerializeToString,
                 response_deserializer=crypto__pb2.CryptoList.FromString,
                 _registered_method=True)
+        self.StreamTopCryptosDelta = channel.unary_stream(
+                '/rpc_info.proto.CryptoService/StreamTopCryptosDelta',
+                request_serializer=crypto__pb2.CryptoRequest.SerializeToString,
+                response_deserializer=crypto__pb2.CryptoUpdate.FromString,
+                _registered_method=True)
         self.GetExchangeRates = channel.unary_unary(
                 '/rpc_info.proto.CryptoService/GetExchangeRates',
                 request_serializer=crypto__pb2.Empty.SerializeToString,
@@ -85,6 +105,27 @@ class CryptoServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def GetPriceHistoryRange(self, request, context):
+        """Historial por rango, reducido en el servidor a max_points
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetPriceHistoryBatch(self, request, context):
+        """Historial de varias criptos en una sola lectura
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def StreamPriceHistory(self, request, context):
+        """Historial crudo de un rango en mensajes de chunk_size puntos, del más antiguo al más reciente
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def StreamTopCryptos(self, request, context):
         """Stream de datos, para que el cliente no haga polling
         """
@@ -92,6 +133,13 @@ class CryptoServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def StreamTopCryptosDelta(self, request, context):
+        """Stream con snapshot inicial y luego solo cambios
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def GetExchangeRates(self, request, context):
         """Cambio de divisas
         """
@@ -117,11 +165,31 @@ def add_CryptoServiceServicer_to_server(servicer, server):
                     request_deserializer=crypto__pb2.HistoricalRequest.FromString,
                     response_serializer=crypto__pb2.HistoricalResponse.SerializeToString,
             ),
+            'GetPriceHistoryRange': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetPriceHistoryRange,
+                    request_deserializer=crypto__pb2.HistoricalRangeRequest.FromString,
+                    response_serializer=crypto__pb2.HistoricalResponse.SerializeToString,
+            ),
+            'GetPriceHistoryBatch': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetPriceHistoryBatch,
+                    request_deserializer=crypto__pb2.HistoricalBatchRequest.FromString,
+                    response_serializer=crypto__pb2.HistoricalBatchResponse.SerializeToString,
+            ),
+            'StreamPriceHistory': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamPriceHistory,
+                    request_deserializer=crypto__pb2.HistoricalStreamRequest.FromString,
+                    response_serializer=crypto__pb2.HistoricalResponse.SerializeToString,
+            ),
             'StreamTopCryptos': grpc.unary_stream_rpc_method_handler(
                     servicer.StreamTopCryptos,
                     request_deserializer=crypto__pb2.CryptoRequest.FromString,
                     response_serializer=crypto__pb2.CryptoList.SerializeToString,
             ),
+            'StreamTopCryptosDelta': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamTopCryptosDelta,
+                    request_deserializer=crypto__pb2.CryptoRequest.FromString,
+                    response_serializer=crypto__pb2.CryptoUpdate.SerializeToString,
+            ),
             'GetExchangeRates': grpc.unary_unary_rpc_method_handler(
                     servicer.GetExchangeRates,
                     request_deserializer=crypto__pb2.Empty.FromString,
@@ -220,6 +288,87 @@ class CryptoService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def GetPriceHistoryRange(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/rpc_info.proto.CryptoService/GetPriceHistoryRange',
+            crypto__pb2.HistoricalRangeRequest.SerializeToString,
+            crypto__pb2.HistoricalResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetPriceHistoryBatch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/rpc_info.proto.CryptoService/GetPriceHistoryBatch',
+            crypto__pb2.HistoricalBatchRequest.SerializeToString,
+            crypto__pb2.HistoricalBatchResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def StreamPriceHistory(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/rpc_info.proto.CryptoService/StreamPriceHistory',
+            crypto__pb2.HistoricalStreamRequest.SerializeToString,
+            crypto__pb2.HistoricalResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def StreamTopCryptos(request,
             target,
@@ -247,6 +396,33 @@ class CryptoService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def StreamTopCryptosDelta(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/rpc_info.proto.CryptoService/StreamTopCryptosDelta',
+            crypto__pb2.CryptoRequest.SerializeToString,
+            crypto__pb2.CryptoUpdate.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def GetExchangeRates(request,
             target,
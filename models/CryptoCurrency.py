@@ -1,4 +1,4 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields, replace
 import time
 
 from generated import crypto_pb2
@@ -67,9 +67,69 @@ class CryptoCurrency:
             last_updated=self.last_updated,
         )
 
+    def to_delta_proto(self, previous: "CryptoCurrency | None" = None):
+        """
+        CryptoDelta con los campos que cambiaron respecto a `previous`.
+        Sin `previous` incluye todos los campos. Retorna None si no hay cambios.
+        Un campo que pasó a None se envía con el valor por defecto del Proto (0 o ""),
+        el mismo que ve un cliente que recibe el snapshot completo.
+        """
+        changed = {
+            f.name: getattr(self, f.name)
+            for f in fields(self)
+            if f.name != "id"
+            and (previous is None or getattr(self, f.name) != getattr(previous, f.name))
+        }
+
+        if previous is not None and not changed:
+            return None
+
+        defaults = crypto_pb2.CryptoDelta.DESCRIPTOR.fields_by_name
+
+        for name, value in changed.items():
+            if value is None:
+                changed[name] = defaults[name].default_value
+
+        return crypto_pb2.CryptoDelta(id=self.id, **changed)
+
+    def apply_delta(self, delta) -> "CryptoCurrency":
+        """
+        Devuelve una copia con los campos presentes en un CryptoDelta.
+        """
+        changed = {
+            f.name: getattr(delta, f.name)
+            for f in fields(self)
+            if f.name != "id" and delta.HasField(f.name)
+        }
+        return replace(self, **changed)
+
     def update_price_factor(self, exchange: float) -> "CryptoCurrency":
-        self.current_price *= exchange
-        self.high_24h *= exchange
-        self.low_24h *= exchange
-        self.price_change_24h *= exchange
-        return self
+        """
+        Devuelve una copia con los precios en otra divisa.
+        No modifica la instancia, que puede estar compartida en la caché local.
+        """
+        return self.with_prices(
+            self.current_price * exchange,
+            self.high_24h * exchange,
+            self.low_24h * exchange,
+            self.price_change_24h * exchange,
+        )
+
+    def with_prices(
+        self,
+        current_price: float,
+        high_24h: float,
+        low_24h: float,
+        price_change_24h: float,
+    ) -> "CryptoCurrency":
+        """
+        Copia con otros precios. Copia el __dict__ directamente en vez de usar
+        dataclasses.replace, que revisa los campos y llama a __init__ en cada copia.
+        """
+        copy = object.__new__(CryptoCurrency)
+        copy.__dict__.update(self.__dict__)
+        copy.current_price = current_price
+        copy.high_24h = high_24h
+        copy.low_24h = low_24h
+        copy.price_change_24h = price_change_24h
+        return copy
@@ -0,0 +1,97 @@
+from dataclasses import dataclass, field
+from array import array
+from itertools import accumulate, pairwise
+
+from generated import crypto_pb2
+from .CryptoHistoryItem import CryptoHistoryItem
+
+
+@dataclass
+class HistorySeries:
+    """
+    Historial de precios de una cripto en formato columnar.
+    Evita crear un CryptoHistoryItem por punto; los objetos se construyen solo al serializar.
+    """
+
+    id: str
+    timestamps: array = field(default_factory=lambda: array("q"))  # Unix timestamps
+    prices: array = field(default_factory=lambda: array("d"))
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def factor_price(self, exchange: float = 1.0) -> "HistorySeries":
+        """
+        Devuelve una nueva serie con los precios multiplicados por el factor de cambio.
+        """
+        return HistorySeries(
+            id=self.id,
+            timestamps=self.timestamps,
+            prices=array("d", (p * exchange for p in self.prices)),
+        )
+
+    def to_items(self) -> list[CryptoHistoryItem]:
+        return [
+            CryptoHistoryItem(id=self.id, timestamp=t, price=p)
+            for t, p in zip(self.timestamps, self.prices)
+        ]
+
+    def to_proto(self, history_format=crypto_pb2.HISTORY_POINTS):
+        """
+        HistoricalResponse en el formato pedido. En columnas los arrays se copian
+        directo a los campos empaquetados, sin crear un mensaje por punto.
+        """
+        if history_format == crypto_pb2.HISTORY_POINTS:
+            return crypto_pb2.HistoricalResponse(
+                id=self.id,
+                prices=[
+                    crypto_pb2.HistoricalPricePoint(timestamp=t, price=p)
+                    for t, p in zip(self.timestamps, self.prices)
+                ],
+            )
+
+        delta = history_format == crypto_pb2.HISTORY_COLUMNS_DELTA
+        timestamps = self.timestamps
+
+        if delta and timestamps:
+            timestamps = [timestamps[0], *(b - a for a, b in pairwise(timestamps))]
+
+        return crypto_pb2.HistoricalResponse(
+            id=self.id,
+            columns=crypto_pb2.HistoricalColumns(
+                timestamps=timestamps, prices=self.prices, delta_timestamps=delta
+            ),
+        )
+
+    @classmethod
+    def from_proto(cls, response) -> "HistorySeries":
+        """
+        Serie desde un HistoricalResponse en cualquiera de los formatos.
+        """
+        if response.HasField("columns"):
+            columns = response.columns
+            timestamps = columns.timestamps
+
+            if columns.delta_timestamps:
+                timestamps = accumulate(timestamps)
+
+            return cls(
+                id=response.id,
+                timestamps=array("q", timestamps),
+                prices=array("d", columns.prices),
+            )
+
+        return cls(
+            id=response.id,
+            timestamps=array("q", (p.timestamp for p in response.prices)),
+            prices=array("d", (p.price for p in response.prices)),
+        )
+
+    def to_dicts(self) -> list[dict]:
+        """
+        Igual que [i.to_dict() for i in self.to_items()], sin crear los CryptoHistoryItem.
+        """
+        return [
+            {"id": self.id, "timestamp": t, "price": p}
+            for t, p in zip(self.timestamps, self.prices)
+        ]
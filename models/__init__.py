@@ -1,3 +1,4 @@
 from .CryptoCurrency import CryptoCurrency
 from .CryptoHistoryItem import CryptoHistoryItem
 from .ExchangeRate import ExchangeRate
+from .HistorySeries import HistorySeries
@@ -0,0 +1,453 @@
+"""
+Acceso asíncrono a Redis para los servidores grpc.aio.
+
+Usa las mismas llaves y formatos que DataCache (cache.py); DataCache sigue siendo
+el camino de escritura de los workers y este módulo el de lectura del servidor,
+para no bloquear el event loop en cada consulta.
+
+Si Redis se cae, las lecturas del snapshot se sirven desde la caché local (último
+snapshot conocido) y `stale_for` indica su antigüedad. Mientras tanto una tarea en
+segundo plano reintenta la conexión con backoff; las lecturas no esperan a Redis.
+"""
+
+import json
+import bisect
+import time
+import asyncio
+import logging
+import functools
+from typing import AsyncIterator
+import redis.asyncio as aioredis
+from redis.exceptions import ConnectionError, TimeoutError
+
+from utils import ProjectEnv
+from models import CryptoCurrency, HistorySeries
+from rollups import RollupTier, RollupBucket
+from conversion import apply_prices, matrix_from_bytes
+from cache import (
+    MAX_HISTORY_SIZE,
+    CacheItem,
+    HistoryEncoding,
+    VersionedReadCache,
+    series_key,
+    rollup_key,
+    decode_points,
+    decode_crypto_data,
+)
+
+log = logging.getLogger(__name__)
+
+MAX_RECONNECT_DELAY = 30
+
+
+def pool_exhausted(error: Exception) -> bool:
+    """
+    True si el error es el timeout del BlockingConnectionPool (todas las conexiones ocupadas),
+    no una falla de conexión: Redis responde, el proceso está saturado.
+    """
+    return isinstance(error, ConnectionError) and isinstance(
+        error.__cause__, asyncio.TimeoutError
+    )
+
+
+def degradable(fallback=None):
+    """
+    Si Redis no responde, pasa la caché a modo degradado y retorna `fallback(local, *args)`:
+    (hit, valor) desde la caché local. Sin fallback, o si no hay copia local, falla
+    de inmediato con ConnectionError en vez de esperar a Redis.
+    Un pool agotado no es una caída: el error se propaga sin cambiar de modo.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            if self.degraded_since is None:
+                try:
+                    value = await func(self, *args, **kwargs)
+                    self.last_success = time.time()
+                    return value
+                except (ConnectionError, TimeoutError) as e:
+                    if pool_exhausted(e):
+                        raise
+
+                    self._degrade(e)
+
+            hit, value = fallback(self._local, *args, **kwargs) if fallback else (False, None)
+
+            if not hit:
+                raise ConnectionError("Redis no disponible y sin copia local")
+
+            return value
+
+        return wrapper
+
+    return decorator
+
+
+class AsyncDataCache:
+    _instance = None
+    _initialized = False
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super(AsyncDataCache, cls).__new__(cls)
+
+        return cls._instance
+
+    def __init__(
+        self,
+        host=ProjectEnv.RPC_INFO_REDIS_HOST,
+        port=ProjectEnv.RPC_INFO_REDIS_PORT,
+        db=0,
+        history_encoding=ProjectEnv.RPC_INFO_HISTORY_ENCODING,
+        max_connections=ProjectEnv.RPC_INFO_REDIS_POOL_SIZE,
+        history_store=None,
+    ):
+        if self._initialized:
+            return
+
+        print("Conectando a Redis (asíncrono)...")
+        print(f"   - Host: {host}")
+        print(f"   - Puerto: {port}")
+        print(f"   - Base de datos: {db}")
+        print(f"   - Conexiones máximas: {max_connections}")
+
+        # Pool bloqueante: si se agotan las conexiones, la petición espera en vez de fallar
+        self.pool = aioredis.BlockingConnectionPool(
+            host=host,
+            port=port,
+            db=db,
+            max_connections=int(max_connections),
+            timeout=5,
+            socket_connect_timeout=2,
+        )
+        self.redis = aioredis.Redis(connection_pool=self.pool)
+        self.history_encoding = HistoryEncoding(history_encoding)
+        # Igual que en DataCache; las lecturas con mmap son síncronas pero de microsegundos
+        self.history_store = history_store
+        self._local = VersionedReadCache()
+
+        self.degraded_since: float | None = None
+        self.last_success: float | None = None
+        self._reconnect_task: asyncio.Task | None = None
+        self._initialized = True
+
+    @property
+    def read_stats(self) -> dict:
+        return self._local.stats
+
+    @property
+    def stale_for(self) -> float | None:
+        """
+        En modo degradado, segundos desde la última lectura exitosa de Redis. None si Redis responde.
+        """
+        if self.degraded_since is None:
+            return None
+
+        return time.time() - (self.last_success or self.degraded_since)
+
+    def _degrade(self, error: Exception):
+        if self.degraded_since is None:
+            log.warning(f"Redis no disponible, sirviendo el último snapshot local: {error}")
+            self.degraded_since = time.time()
+
+        if self._reconnect_task is None or self._reconnect_task.done():
+            self._reconnect_task = asyncio.create_task(self._reconnect())
+
+    async def _reconnect(self):
+        delay = 1
+
+        while True:
+            await asyncio.sleep(delay)
+
+            try:
+                await self.redis.ping()
+            except Exception as e:
+                delay = min(delay * 2, MAX_RECONNECT_DELAY)
+                log.warning(f"Redis sigue sin responder, reintentando en {delay}s: {e}")
+                continue
+
+            log.info(
+                f"Redis disponible de nuevo tras {time.time() - self.degraded_since:.0f}s"
+            )
+            self.degraded_since = None
+            return
+
+    async def _get_versioned(self, item: CacheItem, version_item: CacheItem, decode):
+        """
+        Igual que DataCache._get_versioned: solo descarga el valor si la versión cambió.
+        """
+        hit, value = self._local.get(
+            item.value, await self.redis.get(version_item.value)
+        )
+
+        if hit:
+            return value
+
+        version, raw = await self.redis.mget(version_item.value, item.value)
+        value = decode(raw)
+
+        if item == CacheItem.CRYPTO_DATA:
+            self._local.put_crypto_data(version, value, raw)
+        else:
+            self._local.put(item.value, version, value, raw)
+
+        return value
+
+    @degradable(lambda local: (True, None))
+    async def get_versions(self) -> tuple[bytes | None, bytes | None] | None:
+        """
+        Versiones actuales de crypto:data y de las tasas de cambio, en un solo round trip.
+        Retorna None en modo degradado.
+        """
+        crypto, currency = await self.redis.mget(
+            CacheItem.CRYPTO_VERSION.value, CacheItem.CURRENCY_VERSION.value
+        )
+        return crypto, currency
+
+    @degradable(lambda local: local.last(CacheItem.CRYPTO_DATA.value))
+    async def get_crypto_data(self) -> list[CryptoCurrency]:
+        return await self._get_versioned(
+            CacheItem.CRYPTO_DATA, CacheItem.CRYPTO_VERSION, decode_crypto_data
+        )
+
+    @degradable(lambda local: local.last(CacheItem.CURRENCY_EXCHANGE.value))
+    async def get_exchange(self) -> dict:
+        return await self._get_versioned(
+            CacheItem.CURRENCY_EXCHANGE, CacheItem.CURRENCY_VERSION, json.loads
+        )
+
+    @degradable(lambda local, quantity: local.last_top(quantity))
+    async def get_top_cryptos(self, quantity: int) -> list[CryptoCurrency]:
+        """
+        Igual que DataCache.get_top_cryptos: solo decodifica las primeras `quantity` criptos.
+        """
+        if quantity <= 0:
+            return []
+
+        hit, value = self._local.get_top(
+            await self.redis.get(CacheItem.CRYPTO_VERSION.value), quantity
+        )
+
+        if hit:
+            return value
+
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.get(CacheItem.CRYPTO_VERSION.value)
+        pipe.lrange(CacheItem.CRYPTO_RANKED.value, 0, quantity - 1)
+        version, raw = await pipe.execute()
+
+        # Snapshot guardado antes de existir el ranking
+        if not raw:
+            return (await self.get_crypto_data() or [])[:quantity]
+
+        cryptos = [CryptoCurrency.from_json(json.loads(c)) for c in raw]
+        self._local.put_top(version, cryptos, quantity)
+        return cryptos
+
+    @degradable(
+        lambda local, currency, quantity: local.last_top_in(
+            f"{CacheItem.CRYPTO_PRICES.value}:{currency}", quantity
+        )
+    )
+    async def get_top_cryptos_in(
+        self, currency: str, quantity: int
+    ) -> list[CryptoCurrency] | None:
+        """
+        Primeras `quantity` criptos ya convertidas a `currency` con la matriz que el worker
+        precalcula en cada tick. Retorna None si la divisa no está precalculada.
+        Las copias se arman una vez por versión y divisa; luego es solo una búsqueda local.
+        En modo degradado retorna el último prefijo convertido que se guardó.
+        """
+        if quantity <= 0:
+            return []
+
+        key = f"{CacheItem.CRYPTO_PRICES.value}:{currency}"
+        hit, value = self._local.get_top(
+            await self.redis.get(CacheItem.CRYPTO_VERSION.value), quantity, key
+        )
+
+        if hit:
+            return value
+
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.get(CacheItem.CRYPTO_VERSION.value)
+        pipe.hget(CacheItem.CRYPTO_PRICES.value, currency)
+        pipe.lrange(CacheItem.CRYPTO_RANKED.value, 0, quantity - 1)
+        version, raw_prices, raw = await pipe.execute()
+
+        # Las lecturas de divisas precalculadas no pasan por las tasas: se refrescan aquí
+        # (una vez por tick) para que el modo degradado pueda convertir otras cantidades
+        await self.get_exchange()
+
+        if raw_prices is None or not raw:
+            return None
+
+        cryptos = [CryptoCurrency.from_json(json.loads(c)) for c in raw]
+        self._local.put_top(version, cryptos, quantity)
+        converted = apply_prices(cryptos, matrix_from_bytes(raw_prices, len(cryptos)))
+        self._local.put_top(version, converted, quantity, key)
+        return converted
+
+    @degradable(lambda local, crypto_id: local.last_by_id(crypto_id))
+    async def get_crypto_by_id(self, crypto_id: str) -> CryptoCurrency | None:
+        """
+        Busca una cripto por id en O(1): en el índice local si la versión no cambió,
+        si no con HGET sobre crypto:data:by_id, decodificando solo esa cripto.
+        """
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.get(CacheItem.CRYPTO_VERSION.value)
+        pipe.hget(CacheItem.CRYPTO_DATA_BY_ID.value, crypto_id)
+        version, raw = await pipe.execute()
+
+        hit, index = self._local.get(CacheItem.CRYPTO_DATA_BY_ID.value, version)
+
+        if hit:
+            return index.get(crypto_id)
+
+        return CryptoCurrency.from_json(json.loads(raw)) if raw else None
+
+    # Las lecturas del historial van primero al backend local (si hay), fuera de
+    # @degradable: los segmentos en disco siguen disponibles aunque Redis no responda
+    async def get_crypto_history(
+        self, crypto_id: str, size: int = MAX_HISTORY_SIZE
+    ) -> HistorySeries:
+        """
+        Obtiene los últimos `size` puntos de una cripto, del más antiguo al más reciente.
+        """
+        if size <= 0:
+            return HistorySeries(id=crypto_id)
+
+        if self.history_store is not None:
+            return self.history_store.get_crypto_history(crypto_id, size)
+
+        return await self._get_crypto_history(crypto_id, size)
+
+    @degradable()
+    async def _get_crypto_history(self, crypto_id: str, size: int) -> HistorySeries:
+        key = series_key(crypto_id, self.history_encoding)
+        raw = await self.redis.zrange(key, -size, -1)
+        return decode_points(crypto_id, raw, self.history_encoding)
+
+    async def get_crypto_histories(
+        self, crypto_ids: list[str], size: int = MAX_HISTORY_SIZE
+    ) -> dict[str, HistorySeries]:
+        """
+        Últimos `size` puntos de varias criptos en un solo round trip.
+        """
+        if size <= 0 or not crypto_ids:
+            return {i: HistorySeries(id=i) for i in crypto_ids}
+
+        if self.history_store is not None:
+            return self.history_store.get_crypto_histories(crypto_ids, size)
+
+        return await self._get_crypto_histories(crypto_ids, size)
+
+    @degradable()
+    async def _get_crypto_histories(
+        self, crypto_ids: list[str], size: int
+    ) -> dict[str, HistorySeries]:
+        pipe = self.redis.pipeline(transaction=False)
+
+        for crypto_id in crypto_ids:
+            pipe.zrange(series_key(crypto_id, self.history_encoding), -size, -1)
+
+        raw = await pipe.execute()
+        return {
+            crypto_id: decode_points(crypto_id, points, self.history_encoding)
+            for crypto_id, points in zip(crypto_ids, raw)
+        }
+
+    async def get_crypto_history_range(
+        self, crypto_id: str, start: int, end: int
+    ) -> HistorySeries:
+        """
+        Puntos crudos de una cripto con timestamp entre `start` y `end` (inclusive).
+        """
+        if self.history_store is not None:
+            return self.history_store.get_crypto_history_range(crypto_id, start, end)
+
+        return await self._get_crypto_history_range(crypto_id, start, end)
+
+    @degradable()
+    async def _get_crypto_history_range(
+        self, crypto_id: str, start: int, end: int
+    ) -> HistorySeries:
+        key = series_key(crypto_id, self.history_encoding)
+        raw = await self.redis.zrangebyscore(key, start, end)
+        return decode_points(crypto_id, raw, self.history_encoding)
+
+    async def iter_crypto_history_range(
+        self, crypto_id: str, start: int, end: int, chunk_size: int
+    ) -> AsyncIterator[HistorySeries]:
+        """
+        Puntos crudos entre `start` y `end` en series de a lo sumo `chunk_size` puntos.
+        En Redis pagina el sorted set por score, una página por parte.
+        Sin copia local que servir, en modo degradado falla con ConnectionError.
+        """
+        if self.history_store is not None:
+            for chunk in self.history_store.iter_history_range(
+                crypto_id, start, end, chunk_size
+            ):
+                yield chunk
+
+            return
+
+        if self.degraded_since is not None:
+            raise ConnectionError("Redis no disponible")
+
+        key = series_key(crypto_id, self.history_encoding)
+        # Cursor: score desde el que sigue la página y cuántos miembros con ese score ya se
+        # enviaron (puede haber varios puntos con el mismo timestamp, ver commit_tick)
+        lower, skip = start, 0
+
+        while True:
+            try:
+                raw = await self.redis.zrangebyscore(
+                    key, lower, end, start=skip, num=chunk_size
+                )
+            except (ConnectionError, TimeoutError) as e:
+                if not pool_exhausted(e):
+                    self._degrade(e)
+
+                raise
+
+            if not raw:
+                return
+
+            chunk = decode_points(crypto_id, raw, self.history_encoding)
+            yield chunk
+
+            if len(raw) < chunk_size:
+                return
+
+            last = chunk.timestamps[-1]
+            same = len(chunk.timestamps) - bisect.bisect_left(chunk.timestamps, last)
+            skip = skip + same if last == lower else same
+            lower = last
+
+    @degradable()
+    async def get_rollup(
+        self, crypto_id: str, tier: RollupTier, start: int = 0, end: int = -1
+    ) -> list[RollupBucket]:
+        """
+        Buckets OHLC de una cripto cuyo inicio está entre `start` y `end` (timestamps).
+        end = -1 significa sin límite superior.
+        """
+        raw = await self.redis.zrangebyscore(
+            rollup_key(crypto_id, tier), start, "+inf" if end < 0 else end
+        )
+        return [RollupBucket.from_member(b) for b in raw]
+
+    async def close(self):
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+
+        await self.redis.aclose()
+        await self.pool.disconnect()
+
+    async def alive(self) -> bool:
+        try:
+            return await self.redis.ping()
+        except Exception:
+            return False
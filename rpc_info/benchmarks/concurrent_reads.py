@@ -0,0 +1,84 @@
+"""
+Latencia de peticiones concurrentes: DataCache (síncrono) vs AsyncDataCache (redis.asyncio).
+
+Lanza N corrutinas a la vez, cada una lee el top de criptos y el historial de una cripto
+como lo hace un handler de rpc_info/server.py. Con el cliente síncrono cada round trip
+bloquea el event loop y las peticiones se atienden una detrás de otra; con el asíncrono
+se solapan.
+
+Requiere el Redis configurado en ProjectEnv con datos cargados por workers.py.
+
+Uso:
+    python rpc_info/benchmarks/concurrent_reads.py [--concurrency 200] [--crypto bitcoin]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from cache import DataCache
+from async_cache import AsyncDataCache
+
+
+async def sync_request(cache: DataCache, crypto_id: str) -> float:
+    start = time.perf_counter()
+    cache.get_crypto_data()
+    cache.get_crypto_history(crypto_id, 50)
+    return time.perf_counter() - start
+
+
+async def async_request(cache: AsyncDataCache, crypto_id: str) -> float:
+    start = time.perf_counter()
+    await cache.get_crypto_data()
+    await cache.get_crypto_history(crypto_id, 50)
+    return time.perf_counter() - start
+
+
+async def run(name: str, request, concurrency: int):
+    # Latencia medida desde que se lanzan todas las peticiones
+    launched = time.perf_counter()
+
+    async def timed():
+        await request()
+        return time.perf_counter() - launched
+
+    latencies = sorted(await asyncio.gather(*(timed() for _ in range(concurrency))))
+    p = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1e3
+
+    print(
+        f"{name:<8}{statistics.median(latencies) * 1e3:>10.2f}{p(0.95):>10.2f}"
+        f"{p(0.99):>10.2f}{latencies[-1] * 1e3:>10.2f}"
+    )
+
+
+async def main(concurrency: int, crypto_id: str):
+    sync_cache = DataCache()
+    async_cache = AsyncDataCache()
+
+    print(f"Peticiones concurrentes: {concurrency}")
+    print(f"{'cliente':<8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+
+    # Calentar la caché local de versiones en ambos clientes
+    sync_cache.get_crypto_data()
+    await async_cache.get_crypto_data()
+
+    await run("sync", lambda: sync_request(sync_cache, crypto_id), concurrency)
+    await run("async", lambda: async_request(async_cache, crypto_id), concurrency)
+
+    sync_cache.close()
+    await async_cache.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--crypto", default="bitcoin")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.concurrency, args.crypto))
@@ -0,0 +1,121 @@
+"""
+Conversión de divisa: objeto por objeto vs columnas con NumPy (conversion.py).
+
+Para 50, 1.000 y 10.000 puntos mide:
+- Snapshot: copias con dataclasses.replace (implementación anterior), con
+  update_price_factor (copia del __dict__) y con apply_prices sobre una matriz
+  NumPy ya calculada (el camino de las divisas precalculadas).
+- Historial: HistorySeries.factor_price vs scale_history.
+Cada caso también se mide hasta los Proto, la frontera de serialización.
+
+Uso:
+    python rpc_info/benchmarks/currency_conversion.py
+"""
+
+import os
+import sys
+import time
+import random
+import timeit
+from array import array
+from dataclasses import replace
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from models import CryptoCurrency, HistorySeries
+from conversion import apply_prices, price_matrix, scale_history
+
+SIZES = (50, 1_000, 10_000)
+EXCHANGE = 0.92
+REPEAT = 50
+
+
+def build_cryptos(size: int) -> list[CryptoCurrency]:
+    return [
+        CryptoCurrency(
+            id=f"coin-{i}",
+            symbol=f"c{i}",
+            name=f"Coin {i}",
+            image="",
+            current_price=random.uniform(0.01, 100_000),
+            market_cap=random.randint(1, 10**12),
+            market_cap_rank=i + 1,
+            fully_diluted_valuation=random.randint(1, 10**12),
+            total_volume=random.randint(1, 10**10),
+            high_24h=random.uniform(0.01, 100_000),
+            low_24h=random.uniform(0.01, 100_000),
+            price_change_24h=random.uniform(-100, 100),
+            price_change_percentage_24h=random.uniform(-10, 10),
+            last_updated="2025-01-01T00:00:00.000Z",
+        )
+        for i in range(size)
+    ]
+
+
+def build_series(size: int) -> HistorySeries:
+    start = int(time.time()) - size * 30
+    return HistorySeries(
+        id="bitcoin",
+        timestamps=array("q", range(start, start + size * 30, 30)),
+        prices=array("d", (random.uniform(90_000, 110_000) for _ in range(size))),
+    )
+
+
+def with_replace(c: CryptoCurrency, exchange: float) -> CryptoCurrency:
+    return replace(
+        c,
+        current_price=c.current_price * exchange,
+        high_24h=c.high_24h * exchange,
+        low_24h=c.low_24h * exchange,
+        price_change_24h=c.price_change_24h * exchange,
+    )
+
+
+def per_call(func) -> float:
+    return timeit.timeit(func, number=REPEAT) / REPEAT * 1e3
+
+
+def row(name: str, size: int, *times: float):
+    print(
+        f"{name:<22}{size:>8}"
+        + "".join(f"{t:>12.3f}" if t is not None else f"{'-':>12}" for t in times)
+    )
+
+
+if __name__ == "__main__":
+    print(f"{'caso (ms)':<22}{'puntos':>8}{'replace':>12}{'objetos':>12}{'numpy':>12}")
+
+    for size in SIZES:
+        cryptos = build_cryptos(size)
+        matrix = price_matrix(cryptos)
+        series = build_series(size)
+
+        row(
+            "snapshot",
+            size,
+            per_call(lambda: [with_replace(c, EXCHANGE) for c in cryptos]),
+            per_call(lambda: [c.update_price_factor(EXCHANGE) for c in cryptos]),
+            per_call(lambda: apply_prices(cryptos, matrix * EXCHANGE)),
+        )
+        row(
+            "snapshot + Proto",
+            size,
+            per_call(lambda: [with_replace(c, EXCHANGE).to_proto() for c in cryptos]),
+            per_call(lambda: [c.update_price_factor(EXCHANGE).to_proto() for c in cryptos]),
+            per_call(lambda: [c.to_proto() for c in apply_prices(cryptos, matrix * EXCHANGE)]),
+        )
+        row(
+            "historial",
+            size,
+            None,
+            per_call(lambda: series.factor_price(EXCHANGE)),
+            per_call(lambda: scale_history(series, EXCHANGE)),
+        )
+        row(
+            "historial + Proto",
+            size,
+            None,
+            per_call(lambda: series.factor_price(EXCHANGE).to_proto()),
+            per_call(lambda: scale_history(series, EXCHANGE).to_proto()),
+        )
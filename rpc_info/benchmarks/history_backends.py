@@ -0,0 +1,147 @@
+"""
+Comparación entre los backends del historial crudo: segmentos con mmap vs sorted set en Redis.
+
+Simula una cripto con DAYS días de puntos cada 30 s y mide:
+- Escritura de un tick (un punto) y tamaño en disco/memoria.
+- Últimos MAX_HISTORY_SIZE puntos (GetPriceHistory).
+- Rango de 1 hora y de 7 días en medio de la serie (GetPriceHistoryRange).
+
+Con --redis también mide el sorted set en el servidor configurado en ProjectEnv.
+
+Uso:
+    python rpc_info/benchmarks/history_backends.py [--redis] [--days 90]
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import timeit
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from cache import MAX_HISTORY_SIZE, HistoryEncoding, encode_point, series_key
+from segment_store import SegmentHistoryStore
+
+CRYPTO_ID = "bitcoin"
+REPEAT = 50
+DAYS = 90
+HOUR = 60 * 60
+
+
+def build_points(days: int) -> list[tuple[int, float]]:
+    size = days * 24 * HOUR // 30
+    start = int(time.time()) - size * 30
+    price = 100_000.0
+    points = []
+
+    for i in range(size):
+        price *= 1 + random.uniform(-0.001, 0.001)
+        points.append((start + i * 30, price))
+
+    return points
+
+
+def queries(points: list[tuple[int, float]]) -> dict[str, tuple[int, int]]:
+    middle = points[len(points) // 2][0]
+    return {
+        "rango 1h": (middle, middle + HOUR),
+        "rango 7d": (middle, middle + 7 * 24 * HOUR),
+    }
+
+
+def report(name: str, write: float, latest: float, ranges: dict[str, float], size: int):
+    print(
+        f"{name:<20}{write / REPEAT * 1e6:>12.1f}{latest / REPEAT * 1e3:>12.2f}"
+        + "".join(f"{r / REPEAT * 1e3:>12.3f}" for r in ranges.values())
+        + f"{size / 1024 / 1024:>12.1f}"
+    )
+
+
+def bench_segments(points: list[tuple[int, float]]):
+    root = tempfile.mkdtemp(prefix="history_segments_")
+
+    try:
+        store = SegmentHistoryStore(root, retention=10 * 365 * 24 * HOUR)
+        store.add_points(CRYPTO_ID, points[:-REPEAT])
+
+        tail = iter(points[-REPEAT:])
+        write = timeit.timeit(lambda: store.add_points(CRYPTO_ID, [next(tail)]), number=REPEAT)
+        latest = timeit.timeit(
+            lambda: store.get_crypto_history(CRYPTO_ID, MAX_HISTORY_SIZE), number=REPEAT
+        )
+        ranges = {
+            name: timeit.timeit(
+                lambda: store.get_crypto_history_range(CRYPTO_ID, start, end), number=REPEAT
+            )
+            for name, (start, end) in queries(points).items()
+        }
+        size = sum(
+            os.path.getsize(os.path.join(d, f))
+            for d, _, files in os.walk(root)
+            for f in files
+        )
+
+        report("segmentos (mmap)", write, latest, ranges, size)
+    finally:
+        shutil.rmtree(root)
+
+
+def bench_redis(points: list[tuple[int, float]]):
+    from cache import DataCache, decode_points
+
+    cache = DataCache()
+    encoding = HistoryEncoding.BINARY
+    key = series_key(f"bench:{CRYPTO_ID}", encoding)
+    cache.redis.delete(key)
+
+    # Sin recorte a MAX_HISTORY_SIZE: la misma retención que los segmentos
+    for i in range(0, len(points) - REPEAT, 10_000):
+        chunk = points[i : min(i + 10_000, len(points) - REPEAT)]
+        cache.redis.zadd(key, {encode_point(t, p, encoding): t for t, p in chunk})
+
+    tail = iter(points[-REPEAT:])
+
+    def write():
+        t, p = next(tail)
+        cache.redis.zadd(key, {encode_point(t, p, encoding): t})
+
+    def read(raw):
+        return decode_points(CRYPTO_ID, raw, encoding)
+
+    try:
+        write_time = timeit.timeit(write, number=REPEAT)
+        latest = timeit.timeit(
+            lambda: read(cache.redis.zrange(key, -MAX_HISTORY_SIZE, -1)), number=REPEAT
+        )
+        ranges = {
+            name: timeit.timeit(
+                lambda: read(cache.redis.zrangebyscore(key, start, end)), number=REPEAT
+            )
+            for name, (start, end) in queries(points).items()
+        }
+        size = cache.redis.memory_usage(key) or 0
+
+        report("redis (binary)", write_time, latest, ranges, size)
+    finally:
+        cache.redis.delete(key)
+
+
+if __name__ == "__main__":
+    days = int(sys.argv[sys.argv.index("--days") + 1]) if "--days" in sys.argv else DAYS
+    history = build_points(days)
+
+    print(f"Puntos: {len(history)} ({days} días)")
+    print(
+        f"{'backend':<20}{'tick µs':>12}{'últimos ms':>12}"
+        + "".join(f"{name + ' ms':>12}" for name in queries(history))
+        + f"{'MiB':>12}"
+    )
+
+    bench_segments(history)
+
+    if "--redis" in sys.argv:
+        bench_redis(history)
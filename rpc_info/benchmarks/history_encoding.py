@@ -0,0 +1,103 @@
+"""
+Comparación de tamaño y latencia entre las codificaciones del historial (json vs binary).
+
+Simula el historial completo de una cripto (MAX_HISTORY_SIZE puntos) y mide:
+- Bytes por punto guardados en Redis.
+- Tiempo de codificación de un punto y de decodificación de la serie completa.
+
+Con --redis también mide la lectura real desde el servidor configurado en ProjectEnv.
+
+Uso:
+    python rpc_info/benchmarks/history_encoding.py [--redis]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import timeit
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from cache import (
+    MAX_HISTORY_SIZE,
+    HistoryEncoding,
+    encode_point,
+    decode_points,
+    series_key,
+)
+from models import CryptoHistoryItem
+
+CRYPTO_ID = "bitcoin"
+REPEAT = 20
+
+
+def build_points(size: int = MAX_HISTORY_SIZE) -> list[tuple[int, float]]:
+    start = int(time.time()) - size * 30
+    price = 100_000.0
+    points = []
+
+    for i in range(size):
+        price *= 1 + random.uniform(-0.001, 0.001)
+        points.append((start + i * 30, price))
+
+    return points
+
+
+def bench_memory(points: list[tuple[int, float]]):
+    # Formato anterior: un dict {"id","timestamp","price"} por punto dentro de cada snapshot
+    legacy = [CryptoHistoryItem(CRYPTO_ID, t, p).to_dict() for t, p in points]
+    legacy_size = sum(len(json.dumps(d)) for d in legacy)
+    print(f"Puntos: {len(points)}")
+    print(f"{'formato':<10}{'bytes/punto':>14}{'total KiB':>12}{'encode µs/pt':>15}{'decode ms':>12}")
+    print(f"{'legacy':<10}{legacy_size / len(points):>14.1f}{legacy_size / 1024:>12.1f}")
+
+    for encoding in HistoryEncoding:
+        raw = [encode_point(t, p, encoding) for t, p in points]
+        size = sum(len(r) for r in raw)
+
+        encode = timeit.timeit(
+            lambda: [encode_point(t, p, encoding) for t, p in points], number=REPEAT
+        )
+        decode = timeit.timeit(
+            lambda: decode_points(CRYPTO_ID, raw, encoding), number=REPEAT
+        )
+
+        print(
+            f"{encoding.value:<10}{size / len(points):>14.1f}{size / 1024:>12.1f}"
+            f"{encode / REPEAT / len(points) * 1e6:>15.2f}{decode / REPEAT * 1e3:>12.2f}"
+        )
+
+
+def bench_redis(points: list[tuple[int, float]]):
+    from cache import DataCache
+
+    cache = DataCache()
+    print("\nLectura desde Redis (ZRANGE + decodificación):")
+
+    for encoding in HistoryEncoding:
+        key = series_key(f"bench:{CRYPTO_ID}", encoding)
+        cache.redis.delete(key)
+        cache.redis.zadd(key, {encode_point(t, p, encoding): t for t, p in points})
+
+        def read():
+            decode_points(CRYPTO_ID, cache.redis.zrange(key, 0, -1), encoding)
+
+        elapsed = timeit.timeit(read, number=REPEAT)
+        memory = cache.redis.memory_usage(key)
+        cache.redis.delete(key)
+
+        print(
+            f"{encoding.value:<10}{elapsed / REPEAT * 1e3:>10.2f} ms"
+            f"{(memory or 0) / 1024:>12.1f} KiB en Redis"
+        )
+
+
+if __name__ == "__main__":
+    history = build_points()
+    bench_memory(history)
+
+    if "--redis" in sys.argv:
+        bench_redis(history)
@@ -0,0 +1,64 @@
+"""
+Tamaño y tiempo de serialización de HistoricalResponse en cada HistoryFormat.
+
+Para 50, 1.000 y 10.000 puntos mide, por formato:
+- Bytes del mensaje serializado.
+- Servidor: HistorySeries.to_proto + SerializeToString.
+- Cliente: FromString + HistorySeries.from_proto + to_dicts (lo que hace socket_service).
+
+Uso:
+    python rpc_info/benchmarks/history_payload.py
+"""
+
+import os
+import sys
+import time
+import random
+import timeit
+from array import array
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from generated import crypto_pb2
+from models import HistorySeries
+
+SIZES = (50, 1_000, 10_000)
+FORMATS = {
+    "puntos": crypto_pb2.HISTORY_POINTS,
+    "columnas": crypto_pb2.HISTORY_COLUMNS,
+    "columnas delta": crypto_pb2.HISTORY_COLUMNS_DELTA,
+}
+REPEAT = 20
+
+
+def build_series(size: int) -> HistorySeries:
+    start = int(time.time()) - size * 30
+    return HistorySeries(
+        id="bitcoin",
+        timestamps=array("q", range(start, start + size * 30, 30)),
+        prices=array("d", (random.uniform(90_000, 110_000) for _ in range(size))),
+    )
+
+
+def per_call(func) -> float:
+    return timeit.timeit(func, number=REPEAT) / REPEAT * 1e3
+
+
+if __name__ == "__main__":
+    print(f"{'formato':<16}{'puntos':>8}{'bytes':>10}{'servidor ms':>14}{'cliente ms':>14}")
+
+    for size in SIZES:
+        series = build_series(size)
+
+        for name, history_format in FORMATS.items():
+            raw = series.to_proto(history_format).SerializeToString()
+
+            server = per_call(lambda: series.to_proto(history_format).SerializeToString())
+            client = per_call(
+                lambda: HistorySeries.from_proto(
+                    crypto_pb2.HistoricalResponse.FromString(raw)
+                ).to_dicts()
+            )
+
+            print(f"{name:<16}{size:>8}{len(raw):>10}{server:>14.3f}{client:>14.3f}")
@@ -1,12 +1,16 @@
+import sys
 import redis
 import json
 import time
 import uuid
+import struct
 import logging
+from array import array
 from enum import Enum
 
 from utils import ProjectEnv
-from models import CryptoCurrency, CryptoHistoryItem
+from models import CryptoCurrency, CryptoHistoryItem, HistorySeries
+from rollups import ROLLUP_SCRIPT, RollupTier, RollupBucket, rollup_args
 
 log = logging.getLogger(__name__)
 
@@ -17,9 +21,290 @@ MAX_HISTORY_SIZE = (
 
 class CacheItem(Enum):
     CRYPTO_DATA = "crypto:data"
+    CRYPTO_DATA_BY_ID = "crypto:data:by_id"  # Hash id -> JSON de la cripto
+    CRYPTO_RANKED = "crypto:ranked"  # Lista con el JSON de cada cripto, en orden de market cap
+    CRYPTO_PRICES = "crypto:prices"  # Hash divisa -> matriz de precios convertidos (float64) del tick
+    CRYPTO_VERSION = "crypto:version"  # Se incrementa en cada escritura de crypto:data
     CRYPTO_LAST_UPDATED = "crypto:last_updated"
-    CRYPTO_HISTORY = "crypto:history"
+    CRYPTO_UPDATES = "crypto:updates"  # Canal pub/sub: se publica al confirmar cada tick
+    WRITE_METRICS = "cache:write_metrics"  # Hash con contadores de escrituras
+    WORKER_LEADER = "workers:leader"  # Hash con el lease del worker líder: id, since, renewed
+    WORKER_SCHEDULE = "workers:schedule"  # Hash API externa -> estado de su planificación (JSON)
+    CRYPTO_HISTORY = "crypto:history"  # Formato antiguo: lista de snapshots completos
+    CRYPTO_SERIES = "crypto:series"  # Historial por cripto en JSON: crypto:series:<id>
+    CRYPTO_SERIES_BIN = "crypto:series_bin"  # Historial por cripto en binario
+    CRYPTO_SERIES_IDS = "crypto:series_ids"
+    CRYPTO_ROLLUP = "crypto:rollup"  # OHLC por resolución: crypto:rollup:<tier>:<id>
+    # Timestamp del último snapshot en disco escrito o restaurado
+    HISTORY_SNAPSHOT = "crypto:history_snapshot"
     CURRENCY_EXCHANGE = "currency:exchange"
+    CURRENCY_VERSION = "currency:version"
+
+
+class WriteMetric(Enum):
+    TICKS_COMMITTED = "ticks_committed"  # Ticks que quedaron como el snapshot actual
+    TICKS_MERGED = "ticks_merged"  # Ticks viejos o repetidos: solo se agregó su historial
+    LOCK_WAITS = "lock_waits"  # Escrituras que esperaron un lock ocupado
+    WRITES_DROPPED = "writes_dropped"  # Escrituras descartadas tras esperar el lock
+
+
+# Segundos que una escritura con lock espera antes de descartarse
+LOCK_WAIT = 2
+LOCK_RETRY_INTERVAL = 0.05
+
+# Guarda de secuencia de commit_tick: el snapshot solo se reemplaza si el tick es más
+# reciente que el guardado (last-writer-wins por timestamp del tick, no por orden de llegada).
+# KEYS: last_updated, data, by_id, version, métricas, ranked, prices
+# ARGV: timestamp, canal de avisos, JSON de datos, cantidad de divisas precalculadas,
+#       pares divisa, matriz de precios, y pares id, JSON de cada cripto
+COMMIT_SCRIPT = """
+local ts = tonumber(ARGV[1])
+local last = tonumber(redis.call("GET", KEYS[1]) or "0")
+
+if ts <= last then
+    redis.call("HINCRBY", KEYS[5], "ticks_merged", 1)
+    return 0
+end
+
+redis.call("SET", KEYS[2], ARGV[3])
+redis.call("DEL", KEYS[3], KEYS[6], KEYS[7])
+
+local cryptos = 5 + 2 * tonumber(ARGV[4])
+
+for i = 5, cryptos - 1, 2 do
+    redis.call("HSET", KEYS[7], ARGV[i], ARGV[i + 1])
+end
+
+for i = cryptos, #ARGV, 2 do
+    redis.call("HSET", KEYS[3], ARGV[i], ARGV[i + 1])
+    redis.call("RPUSH", KEYS[6], ARGV[i + 1])
+end
+
+redis.call("INCR", KEYS[4])
+redis.call("SET", KEYS[1], ts)
+redis.call("HINCRBY", KEYS[5], "ticks_committed", 1)
+redis.call("PUBLISH", ARGV[2], ts)
+return 1
+"""
+
+
+# Adquiere o renueva el lease del líder. Retorna 1 si `id` es el líder.
+# KEYS: lease; ARGV: id, ttl en ms, timestamp actual
+LEASE_SCRIPT = """
+local current = redis.call("HGET", KEYS[1], "id")
+
+if current == ARGV[1] then
+    redis.call("HSET", KEYS[1], "renewed", ARGV[3])
+    redis.call("PEXPIRE", KEYS[1], ARGV[2])
+    return 1
+end
+
+if not current then
+    redis.call("HSET", KEYS[1], "id", ARGV[1], "since", ARGV[3], "renewed", ARGV[3])
+    redis.call("PEXPIRE", KEYS[1], ARGV[2])
+    return 1
+end
+
+return 0
+"""
+
+RELEASE_LEASE_SCRIPT = """
+if redis.call("HGET", KEYS[1], "id") == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+
+return 0
+"""
+
+
+class HistoryEncoding(Enum):
+    JSON = "json"  # Miembro: "[timestamp, price]"
+    BINARY = "binary"  # Miembro: registro empaquetado de 16 bytes
+
+
+# Registro binario: int64 timestamp + float64 precio, little-endian (compatible con NumPy "<i8,<f8")
+HISTORY_RECORD = struct.Struct("<qd")
+
+
+def series_key(crypto_id: str, encoding: HistoryEncoding = HistoryEncoding.JSON) -> str:
+    """
+    Llave del sorted set con el historial de una cripto.
+    Cada miembro es un punto (timestamp, price) y su score es el timestamp.
+    """
+    if encoding == HistoryEncoding.BINARY:
+        return f"{CacheItem.CRYPTO_SERIES_BIN.value}:{crypto_id}"
+
+    return f"{CacheItem.CRYPTO_SERIES.value}:{crypto_id}"
+
+
+def rollup_key(crypto_id: str, tier: RollupTier) -> str:
+    return f"{CacheItem.CRYPTO_ROLLUP.value}:{tier.name}:{crypto_id}"
+
+
+def encode_point(timestamp: int, price: float, encoding: HistoryEncoding) -> bytes:
+    if encoding == HistoryEncoding.BINARY:
+        return HISTORY_RECORD.pack(int(timestamp), float(price))
+
+    return json.dumps([timestamp, price]).encode()
+
+
+def decode_points(
+    crypto_id: str, raw: list[bytes], encoding: HistoryEncoding
+) -> HistorySeries:
+    """
+    Decodifica los miembros de un sorted set a columnas sin crear objetos por punto.
+    """
+    if encoding == HistoryEncoding.BINARY:
+        buffer = memoryview(b"".join(raw))
+
+        if len(buffer) % HISTORY_RECORD.size:
+            log.error(f"Historial binario de {crypto_id} corrupto ({len(buffer)} bytes)")
+            buffer = buffer[: len(buffer) - len(buffer) % HISTORY_RECORD.size]
+
+        # Cada registro son dos palabras de 8 bytes: [timestamp, precio]
+        timestamps = array("q", buffer.cast("q")[0::2].tobytes())
+        prices = array("d", buffer.cast("d")[1::2].tobytes())
+
+        if sys.byteorder != "little":
+            timestamps.byteswap()
+            prices.byteswap()
+
+        return HistorySeries(id=crypto_id, timestamps=timestamps, prices=prices)
+
+    series = HistorySeries(id=crypto_id)
+
+    for point in raw:
+        try:
+            timestamp, price = json.loads(point)
+            series.timestamps.append(int(timestamp))
+            series.prices.append(float(price))
+        except (json.JSONDecodeError, ValueError, TypeError) as e:
+            log.error(f"Error parseando punto del historial de {crypto_id}: {e}")
+
+    return series
+
+
+def decode_crypto_data(raw: bytes | None) -> list[CryptoCurrency]:
+    return [CryptoCurrency.from_json(d) for d in json.loads(raw)] if raw else []
+
+
+class VersionedReadCache:
+    """
+    Caché local de lecturas: {llave: (versión, valor decodificado)}.
+    Un valor solo es válido mientras la llave de versión en Redis no cambie.
+    """
+
+    def __init__(self):
+        self._values: dict[str, tuple[bytes, object]] = {}
+        self.stats = {"hits": 0, "misses": 0}
+
+    def get(self, key: str, version: bytes | None) -> tuple[bool, object]:
+        cached = self._values.get(key)
+
+        if version is not None and cached and cached[0] == version:
+            self.stats["hits"] += 1
+            return True, cached[1]
+
+        self.stats["misses"] += 1
+        return False, None
+
+    def put(self, key: str, version: bytes | None, value, raw: bytes | None):
+        if version is not None and raw is not None:
+            self._values[key] = (version, value)
+
+    def put_crypto_data(self, version: bytes | None, cryptos: list, raw: bytes | None):
+        """
+        Guarda la lista decodificada y su índice por id, construido una vez por versión.
+        """
+        self.put(CacheItem.CRYPTO_DATA.value, version, cryptos, raw)
+        self.put(
+            CacheItem.CRYPTO_DATA_BY_ID.value, version, {c.id: c for c in cryptos}, raw
+        )
+
+    def get_top(
+        self, version: bytes | None, quantity: int, key: str = CacheItem.CRYPTO_RANKED.value
+    ) -> tuple[bool, list]:
+        """
+        Primeras `quantity` criptos de la versión: de la lista completa si ya está
+        decodificada, o de un prefijo decodificado antes que sea suficientemente largo.
+        Con otra `key` busca el prefijo guardado en esa llave (p. ej. ya convertido a una divisa).
+        """
+        if version is not None:
+            cached = self._values.get(CacheItem.CRYPTO_DATA.value)
+
+            if key == CacheItem.CRYPTO_RANKED.value and cached and cached[0] == version:
+                self.stats["hits"] += 1
+                return True, cached[1][:quantity]
+
+            cached = self._values.get(key)
+
+            if cached and cached[0] == version:
+                prefix, complete = cached[1]
+
+                if complete or len(prefix) >= quantity:
+                    self.stats["hits"] += 1
+                    return True, prefix[:quantity]
+
+        self.stats["misses"] += 1
+        return False, None
+
+    def last(self, key: str) -> tuple[bool, object]:
+        """
+        Último valor guardado de `key` sin importar su versión (último snapshot conocido).
+        """
+        cached = self._values.get(key)
+        return (True, cached[1]) if cached else (False, None)
+
+    def last_top(self, quantity: int) -> tuple[bool, list]:
+        hit, cryptos = self.last(CacheItem.CRYPTO_DATA.value)
+
+        if not hit:
+            hit, ranked = self.last(CacheItem.CRYPTO_RANKED.value)
+            cryptos = ranked[0] if hit else None
+
+        return hit, cryptos[:quantity] if hit else None
+
+    def last_top_in(self, key: str, quantity: int) -> tuple[bool, list | None]:
+        """
+        Último prefijo guardado en `key` (p. ej. ya convertido a una divisa).
+        Sin copia local, (True, None): quien llama debe convertir desde el ranking local.
+        """
+        hit, value = self.last(key)
+        return True, value[0][:quantity] if hit else None
+
+    def last_by_id(self, crypto_id: str) -> tuple[bool, object]:
+        hit, index = self.last(CacheItem.CRYPTO_DATA_BY_ID.value)
+
+        if hit:
+            return hit, index.get(crypto_id)
+
+        # Sin índice local, el último prefijo del ranking puede tenerla
+        hit, ranked = self.last(CacheItem.CRYPTO_RANKED.value)
+        found = next((c for c in ranked[0] if c.id == crypto_id), None) if hit else None
+        return found is not None, found
+
+    def put_top(
+        self,
+        version: bytes | None,
+        cryptos: list,
+        quantity: int,
+        key: str = CacheItem.CRYPTO_RANKED.value,
+    ):
+        """
+        Guarda un prefijo del ranking. Si trae menos de `quantity` criptos, es el ranking completo.
+        """
+        if version is None:
+            return
+
+        cached = self._values.get(key)
+
+        if cached and cached[0] == version and len(cached[1][0]) >= len(cryptos):
+            return
+
+        self._values[key] = (
+            version,
+            (cryptos, len(cryptos) < quantity),
+        )
 
 
 class DataCache:
@@ -37,17 +322,45 @@ class DataCache:
         host=ProjectEnv.RPC_INFO_REDIS_HOST,
         port=ProjectEnv.RPC_INFO_REDIS_PORT,
         db=0,
+        history_encoding=ProjectEnv.RPC_INFO_HISTORY_ENCODING,
+        history_store=None,
     ):
-        if self._initialized and self.alive():
+        if self._initialized:
+            if not self.alive():
+                # Reconexión: solo se rehace el cliente. El backend del historial, la
+                # codificación y la caché local son configuración del proceso y se mantienen
+                log.warning("Redis no responde, reconectando...")
+                self._connect(*self._address)
+
             return
 
         print("Conectando a Redis...")
         print(f"   - Host: {host}")
         print(f"   - Puerto: {port}")
         print(f"   - Base de datos: {db}")
-        self.redis = redis.Redis(host=host, port=port, db=db, decode_responses=True)
+        print(f"   - Codificación del historial: {history_encoding}")
+        self._address = (host, port, db)
+        self.history_encoding = HistoryEncoding(history_encoding)
+        # Backend alternativo del historial crudo (segment_store.SegmentHistoryStore); None = Redis
+        self.history_store = history_store
+
+        self._local = VersionedReadCache()
+        self._connect(host, port, db)
         self._initialized = True
 
+    def _connect(self, host, port, db):
+        # Sin decode_responses: el historial binario se lee como bytes y json.loads acepta bytes
+        self.redis = redis.Redis(host=host, port=port, db=db)
+        self._rollup_script = self.redis.register_script(ROLLUP_SCRIPT)
+        self._commit_script = self.redis.register_script(COMMIT_SCRIPT)
+        self._lease_script = self.redis.register_script(LEASE_SCRIPT)
+        self._release_lease_script = self.redis.register_script(RELEASE_LEASE_SCRIPT)
+        self._scripts_loaded = False
+
+    @property
+    def read_stats(self) -> dict:
+        return self._local.stats
+
     def acquire_lock(self, lock_name: str, expire: int = 30) -> str | None:
         """
         Intenta adquirir un lock. Retorna un token si lo logra, o None si ya está tomado.
@@ -80,13 +393,28 @@ class DataCache:
 
         return released
 
-    def with_lock(lock_name, expire=30):
+    def with_lock(lock_name, expire=30, wait=LOCK_WAIT):
+        """
+        Ejecuta la escritura con el lock tomado. Si está ocupado reintenta durante `wait`
+        segundos; solo entonces la descarta, con un warning y la métrica WRITES_DROPPED.
+        """
         lock_name += ":lock"
 
         def decorator(func):
             def wrapper(self, *args, **kwargs):
                 token = self.acquire_lock(lock_name, expire)
+
+                if not token:
+                    self.count_write(WriteMetric.LOCK_WAITS)
+                    deadline = time.monotonic() + wait
+
+                    while not token and time.monotonic() < deadline:
+                        time.sleep(LOCK_RETRY_INTERVAL)
+                        token = self.acquire_lock(lock_name, expire)
+
                 if not token:
+                    log.warning(f"Lock {lock_name} ocupado: {func.__name__} descartado")
+                    self.count_write(WriteMetric.WRITES_DROPPED)
                     return
                 try:
                     return func(self, *args, **kwargs)
@@ -97,30 +425,420 @@ class DataCache:
 
         return decorator
 
-    @with_lock(CacheItem.CRYPTO_DATA.value)
-    def save_crypto_data(self, cryptos: list[CryptoCurrency]):
-        self.redis.set(
-            CacheItem.CRYPTO_DATA.value, json.dumps([c.to_dict() for c in cryptos])
+    def acquire_lease(self, worker_id: str, ttl: float) -> bool:
+        """
+        Toma el lease de líder si está libre o lo renueva si ya es de `worker_id`.
+        El lease expira solo si el líder deja de renovarlo durante `ttl` segundos.
+        """
+        return (
+            self._lease_script(
+                keys=[CacheItem.WORKER_LEADER.value],
+                args=[worker_id, int(ttl * 1000), time.time()],
+            )
+            == 1
+        )
+
+    def release_lease(self, worker_id: str) -> bool:
+        return (
+            self._release_lease_script(
+                keys=[CacheItem.WORKER_LEADER.value], args=[worker_id]
+            )
+            == 1
         )
-        self.redis.set(CacheItem.CRYPTO_LAST_UPDATED.value, int(time.time()))
 
-    @with_lock(CacheItem.CRYPTO_HISTORY.value)
-    def save_crypto_history(self, snapshot: list[CryptoHistoryItem]):
-        # Usar to_dict() en lugar de __dict__ para asegurar formato correcto
-        serialized = json.dumps([item.to_dict() for item in snapshot])
+    def get_leader(self) -> dict | None:
+        """
+        Líder actual: id, desde cuándo lidera, última renovación y edad del lease en segundos.
+        """
+        raw = self.redis.hgetall(CacheItem.WORKER_LEADER.value)
+
+        if not raw:
+            return None
 
-        self.redis.lpush(CacheItem.CRYPTO_HISTORY.value, serialized)
-        self.redis.ltrim(CacheItem.CRYPTO_HISTORY.value, 0, MAX_HISTORY_SIZE - 1)
+        leader = {k.decode(): v.decode() for k, v in raw.items()}
+        since, renewed = float(leader["since"]), float(leader["renewed"])
+
+        return {
+            "id": leader["id"],
+            "since": since,
+            "renewed": renewed,
+            "age": time.time() - since,
+        }
+
+    def save_schedule(self, name: str, schedule: dict):
+        self.redis.hset(CacheItem.WORKER_SCHEDULE.value, name, json.dumps(schedule))
+
+    def get_schedule(self) -> dict[str, dict]:
+        """
+        Estado de la planificación de cada API externa: intervalo, próximo tick, presupuesto.
+        """
+        raw = self.redis.hgetall(CacheItem.WORKER_SCHEDULE.value)
+        return {k.decode(): json.loads(v) for k, v in raw.items()}
+
+    def commit_tick(
+        self,
+        cryptos: list[CryptoCurrency],
+        snapshot: list[CryptoHistoryItem],
+        timestamp: int,
+        prices: dict[str, bytes] | None = None,
+    ) -> bool:
+        """
+        Guarda un tick completo de ingesta en un solo round trip (MULTI/EXEC):
+        datos, historial de cada cripto, rollups OHLC, versión y last_updated,
+        y publica el aviso en CacheItem.CRYPTO_UPDATES.
+        Los lectores ven el tick anterior o el nuevo completo, nunca una mezcla.
+
+        Con varios writers no se pierde ningún tick: si ya hay un snapshot igual o más
+        reciente, el tick se fusiona (solo historial y rollups) y se cuenta en TICKS_MERGED.
+        Retorna True si el tick quedó como snapshot actual.
+
+        args:
+            cryptos (list[CryptoCurrency]): Top de criptomonedas en la divisa base.
+            snapshot (list[CryptoHistoryItem]): Punto de historial de cada cripto.
+            timestamp (int): Unix timestamp del tick.
+            prices (dict[str, bytes]): Matriz de precios de `cryptos` convertida a cada
+                divisa precalculada (conversion.price_matrices).
+        """
+        # Compactar el tick en los buckets de cada resolución
+        rollup_keys, rollup_values = rollup_args(
+            rollup_key,
+            [
+                (c.id, c.current_price, c.total_volume)
+                for c in cryptos
+                if c.current_price is not None
+            ],
+            timestamp,
+        )
+
+        # Datos, índice por id, versión, last_updated y aviso solo si el tick es el más reciente.
+        # El aviso se publica dentro de EXEC: los suscriptores lo reciben con el tick ya visible
+        # Cada cripto se serializa una vez y se reutiliza en la lista, el índice y el ranking
+        encoded = [json.dumps(c.to_dict()) for c in cryptos]
+        prices = prices or {}
+        args = [
+            timestamp,
+            CacheItem.CRYPTO_UPDATES.value,
+            f"[{', '.join(encoded)}]",
+            len(prices),
+        ]
+
+        for currency, matrix in prices.items():
+            args.extend((currency, matrix))
+
+        for c, raw in zip(cryptos, encoded):
+            args.extend((c.id, raw))
+
+        commit_keys = [
+            CacheItem.CRYPTO_LAST_UPDATED.value,
+            CacheItem.CRYPTO_DATA.value,
+            CacheItem.CRYPTO_DATA_BY_ID.value,
+            CacheItem.CRYPTO_VERSION.value,
+            CacheItem.WRITE_METRICS.value,
+            CacheItem.CRYPTO_RANKED.value,
+            CacheItem.CRYPTO_PRICES.value,
+        ]
+
+        if not self._scripts_loaded:
+            self._load_scripts()
+
+        for retry in (False, True):
+            pipe = self.redis.pipeline(transaction=True)
+
+            # Historial y rollups siempre se agregan: son idempotentes y no dependen del orden,
+            # así un tick de otra réplica o atrasado no deja huecos
+            if self.history_store is None:
+                for item in snapshot:
+                    self._add_points(pipe, item.id, [(item.timestamp, item.price)])
+
+                if snapshot:
+                    pipe.sadd(
+                        CacheItem.CRYPTO_SERIES_IDS.value, *{item.id for item in snapshot}
+                    )
+
+            # EVALSHA directo: con Script(client=pipe) redis-py manda un SCRIPT EXISTS antes
+            # de cada EXEC, un round trip más por tick
+            if rollup_keys:
+                pipe.evalsha(
+                    self._rollup_script.sha, len(rollup_keys), *rollup_keys, *rollup_values
+                )
+
+            pipe.evalsha(self._commit_script.sha, len(commit_keys), *commit_keys, *args)
+
+            try:
+                committed = pipe.execute()[-1] == 1
+                break
+            except redis.exceptions.NoScriptError:
+                if retry:
+                    raise
+
+                # Redis reiniciado o SCRIPT FLUSH: ningún script corrió y el resto es
+                # idempotente, así que se cargan de nuevo y se repite el tick
+                log.warning("Scripts de commit_tick no cargados en Redis, cargando de nuevo")
+                self._load_scripts()
+
+        if self.history_store is not None:
+            self.history_store.add_tick(snapshot)
+
+        if not committed:
+            log.info(f"Tick {timestamp} fusionado: ya hay un snapshot igual o más reciente")
+
+        return committed
+
+    def _load_scripts(self):
+        """
+        Carga en Redis los scripts que commit_tick llama con EVALSHA dentro del pipeline.
+        """
+        for script in (self._rollup_script, self._commit_script):
+            script.sha = self.redis.script_load(script.script)
+
+        self._scripts_loaded = True
+
+    def count_write(self, metric: WriteMetric, amount: int = 1):
+        self.redis.hincrby(CacheItem.WRITE_METRICS.value, metric.value, amount)
+
+    def get_write_metrics(self) -> dict[str, int]:
+        raw = self.redis.hgetall(CacheItem.WRITE_METRICS.value)
+        return {k.decode(): int(v) for k, v in raw.items()}
+
+    def _add_points(self, pipe, crypto_id: str, points: list[tuple[int, float]]):
+        """
+        Agrega puntos (timestamp, price) al historial de una cripto y recorta al máximo.
+        """
+        key = series_key(crypto_id, self.history_encoding)
+        members = {encode_point(t, p, self.history_encoding): t for t, p in points}
+
+        pipe.zadd(key, members)
+        pipe.zremrangebyrank(key, 0, -(MAX_HISTORY_SIZE + 1))
 
     @with_lock(CacheItem.CURRENCY_EXCHANGE.value)
-    def save_exchange(self, exchange_data: dict):
-        self.redis.set(CacheItem.CURRENCY_EXCHANGE.value, json.dumps(exchange_data))
+    def save_exchange(self, exchange_data: dict) -> bool:
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.set(CacheItem.CURRENCY_EXCHANGE.value, json.dumps(exchange_data))
+        pipe.incr(CacheItem.CURRENCY_VERSION.value)
+        pipe.execute()
+        return True
+
+    def _get_versioned(self, item: CacheItem, version_item: CacheItem, decode):
+        """
+        Lectura con caché local: solo consulta la llave de versión y vuelve a
+        descargar y decodificar el valor cuando la versión cambió.
+        """
+        hit, value = self._local.get(
+            item.value, self.redis.get(version_item.value)
+        )
+
+        if hit:
+            return value
+
+        # Versión y valor en un solo MGET para que correspondan a la misma escritura
+        version, raw = self.redis.mget(version_item.value, item.value)
+        value = decode(raw)
+
+        if item == CacheItem.CRYPTO_DATA:
+            self._local.put_crypto_data(version, value, raw)
+        else:
+            self._local.put(item.value, version, value, raw)
+
+        return value
 
     def get_crypto_data(self) -> list[CryptoCurrency]:
-        raw = self.redis.get(CacheItem.CRYPTO_DATA.value)
-        return [CryptoCurrency.from_json(d) for d in json.loads(raw)] if raw else []
+        return self._get_versioned(
+            CacheItem.CRYPTO_DATA, CacheItem.CRYPTO_VERSION, decode_crypto_data
+        )
+
+    def get_top_cryptos(self, quantity: int) -> list[CryptoCurrency]:
+        """
+        Primeras `quantity` criptos por market cap, decodificando solo esas con LRANGE
+        sobre crypto:ranked en vez de la lista completa.
+        """
+        if quantity <= 0:
+            return []
+
+        hit, value = self._local.get_top(
+            self.redis.get(CacheItem.CRYPTO_VERSION.value), quantity
+        )
+
+        if hit:
+            return value
+
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.get(CacheItem.CRYPTO_VERSION.value)
+        pipe.lrange(CacheItem.CRYPTO_RANKED.value, 0, quantity - 1)
+        version, raw = pipe.execute()
+
+        # Snapshot guardado antes de existir el ranking
+        if not raw:
+            return (self.get_crypto_data() or [])[:quantity]
+
+        cryptos = [CryptoCurrency.from_json(json.loads(c)) for c in raw]
+        self._local.put_top(version, cryptos, quantity)
+        return cryptos
+
+    def get_crypto_by_id(self, crypto_id: str) -> CryptoCurrency | None:
+        """
+        Busca una cripto por id en O(1): en el índice local si la versión no cambió,
+        si no con HGET sobre crypto:data:by_id, decodificando solo esa cripto.
+        """
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.get(CacheItem.CRYPTO_VERSION.value)
+        pipe.hget(CacheItem.CRYPTO_DATA_BY_ID.value, crypto_id)
+        version, raw = pipe.execute()
+
+        hit, index = self._local.get(CacheItem.CRYPTO_DATA_BY_ID.value, version)
+
+        if hit:
+            return index.get(crypto_id)
+
+        return CryptoCurrency.from_json(json.loads(raw)) if raw else None
+
+    def get_crypto_history(
+        self, crypto_id: str, size: int = MAX_HISTORY_SIZE
+    ) -> HistorySeries:
+        """
+        Obtiene los últimos `size` puntos de una cripto, del más antiguo al más reciente.
+        """
+        if size <= 0:
+            return HistorySeries(id=crypto_id)
+
+        if self.history_store is not None:
+            return self.history_store.get_crypto_history(crypto_id, size)
+
+        key = series_key(crypto_id, self.history_encoding)
+        raw = self.redis.zrange(key, -size, -1)
+        return decode_points(crypto_id, raw, self.history_encoding)
+
+    def get_crypto_histories(
+        self, crypto_ids: list[str], size: int = MAX_HISTORY_SIZE
+    ) -> dict[str, HistorySeries]:
+        """
+        Últimos `size` puntos de varias criptos en un solo round trip.
+        """
+        if self.history_store is not None:
+            return self.history_store.get_crypto_histories(crypto_ids, size)
+
+        pipe = self.redis.pipeline(transaction=False)
+
+        for crypto_id in crypto_ids:
+            pipe.zrange(series_key(crypto_id, self.history_encoding), -size, -1)
 
-    def get_crypto_history(self) -> list[CryptoHistoryItem]:
+        return {
+            crypto_id: decode_points(crypto_id, raw, self.history_encoding)
+            for crypto_id, raw in zip(crypto_ids, pipe.execute())
+        }
+
+    def get_crypto_history_range(
+        self, crypto_id: str, start: int, end: int
+    ) -> HistorySeries:
+        """
+        Puntos crudos de una cripto con timestamp entre `start` y `end` (inclusive).
+        """
+        if self.history_store is not None:
+            return self.history_store.get_crypto_history_range(crypto_id, start, end)
+
+        key = series_key(crypto_id, self.history_encoding)
+        raw = self.redis.zrangebyscore(key, start, end)
+        return decode_points(crypto_id, raw, self.history_encoding)
+
+    def get_rollup(
+        self, crypto_id: str, tier: RollupTier, start: int = 0, end: int = -1
+    ) -> list[RollupBucket]:
+        """
+        Buckets OHLC de una cripto cuyo inicio está entre `start` y `end` (timestamps).
+        end = -1 significa sin límite superior.
+        """
+        raw = self.redis.zrangebyscore(
+            rollup_key(crypto_id, tier), start, "+inf" if end < 0 else end
+        )
+        return [RollupBucket.from_member(b) for b in raw]
+
+    def get_history_ids(self) -> set[str]:
+        if self.history_store is not None:
+            return self.history_store.ids()
+
+        return {i.decode() for i in self.redis.smembers(CacheItem.CRYPTO_SERIES_IDS.value)}
+
+    def restore_history(self, series: list[HistorySeries]) -> int:
+        """
+        Agrega series completas al historial (por ejemplo desde un snapshot en disco).
+        Es idempotente: los puntos que ya existen no se duplican.
+        """
+        pipe = self.redis.pipeline(transaction=False)
+        restored = 0
+
+        for s in series:
+            if len(s):
+                self._add_points(pipe, s.id, zip(s.timestamps, s.prices))
+                restored += len(s)
+
+        ids = [s.id for s in series if len(s)]
+
+        if ids:
+            pipe.sadd(CacheItem.CRYPTO_SERIES_IDS.value, *ids)
+
+        pipe.execute()
+        return restored
+
+    def has(self, item: CacheItem) -> bool:
+        return self.redis.exists(item.value) > 0
+
+    def get_snapshot_marker(self) -> int | None:
+        marker = self.redis.get(CacheItem.HISTORY_SNAPSHOT.value)
+        return int(marker) if marker else None
+
+    def set_snapshot_marker(self, timestamp: int):
+        self.redis.set(CacheItem.HISTORY_SNAPSHOT.value, timestamp)
+
+    @with_lock(CacheItem.CRYPTO_HISTORY.value, expire=120)
+    def migrate_legacy_history(self) -> int:
+        """
+        Migra al historial por cripto en la codificación actual:
+        - La lista antigua `crypto:history` (un JSON por snapshot), que se elimina al terminar.
+        - Las series guardadas con la otra codificación (json <-> binary).
+
+        Retorna la cantidad de puntos migrados.
+        """
+        points: dict[str, list[tuple[int, float]]] = {}
+
+        for item in self._get_legacy_history():
+            points.setdefault(item.id, []).append((item.timestamp, item.price))
+
+        other = (
+            HistoryEncoding.JSON
+            if self.history_encoding == HistoryEncoding.BINARY
+            else HistoryEncoding.BINARY
+        )
+        other_keys = []
+
+        for crypto_id in self.get_history_ids():
+            key = series_key(crypto_id, other)
+            series = decode_points(crypto_id, self.redis.zrange(key, 0, -1), other)
+
+            if len(series):
+                other_keys.append(key)
+                points.setdefault(crypto_id, []).extend(
+                    zip(series.timestamps, series.prices)
+                )
+
+        if not points:
+            return 0
+
+        pipe = self.redis.pipeline(transaction=False)
+
+        for crypto_id, crypto_points in points.items():
+            self._add_points(pipe, crypto_id, crypto_points)
+
+        pipe.sadd(CacheItem.CRYPTO_SERIES_IDS.value, *points.keys())
+        pipe.delete(CacheItem.CRYPTO_HISTORY.value, *other_keys)
+        pipe.execute()
+
+        total = sum(len(p) for p in points.values())
+        log.info(f"Historial migrado: {total} puntos de {len(points)} criptos")
+        return total
+
+    def _get_legacy_history(self) -> list[CryptoHistoryItem]:
+        """
+        Lee el formato antiguo: lista de snapshots, cada uno un JSON con todas las criptos.
+        """
         raw = self.redis.lrange(CacheItem.CRYPTO_HISTORY.value, 0, -1)
 
         history: list[CryptoHistoryItem] = []
@@ -154,8 +872,9 @@ class DataCache:
         return history
 
     def get_exchange(self) -> dict:
-        raw = self.redis.get(CacheItem.CURRENCY_EXCHANGE.value)
-        return json.loads(raw)
+        return self._get_versioned(
+            CacheItem.CURRENCY_EXCHANGE, CacheItem.CURRENCY_VERSION, json.loads
+        )
 
     def close(self):
         self.redis.close()
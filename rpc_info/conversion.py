@@ -0,0 +1,88 @@
+"""
+Conversión de divisa vectorizada con NumPy para snapshots e historiales.
+
+Los precios se escalan como columnas float64 en una sola operación. En el historial
+evita un float de Python por punto; en un snapshot el costo lo domina la copia de
+cada CryptoCurrency, así que conviene cuando la matriz ya está calculada y se
+reutiliza para varias divisas (ver benchmarks/currency_conversion.py).
+Vive en rpc_info y no en models porque models también lo usan servicios sin NumPy.
+"""
+
+from array import array
+
+import numpy as np
+
+from models import CryptoCurrency, HistorySeries
+
+# Columnas de precios en la matriz de un snapshot, en el orden de CryptoCurrency.with_prices
+PRICE_FIELDS = ("current_price", "high_24h", "low_24h", "price_change_24h")
+# Formato de las matrices guardadas en Redis: float64 little-endian, una fila por cripto
+MATRIX_DTYPE = np.dtype("<f8")
+
+
+def price_matrix(cryptos: list[CryptoCurrency]) -> np.ndarray:
+    """
+    Matriz (n, len(PRICE_FIELDS)) con los precios de cada cripto. Un precio None queda como NaN.
+    """
+    return np.array(
+        [(c.current_price, c.high_24h, c.low_24h, c.price_change_24h) for c in cryptos],
+        dtype=np.float64,
+    ).reshape(len(cryptos), len(PRICE_FIELDS))
+
+
+def apply_prices(cryptos: list[CryptoCurrency], matrix: np.ndarray) -> list[CryptoCurrency]:
+    """
+    Copias de `cryptos` con los precios de cada fila de `matrix`. NaN vuelve a ser None.
+    """
+    rows = matrix.tolist()
+
+    if np.isnan(matrix).any():
+        rows = [[None if p != p else p for p in row] for row in rows]
+
+    return [c.with_prices(*row) for c, row in zip(cryptos, rows)]
+
+
+def price_matrices(
+    cryptos: list[CryptoCurrency], exchange: dict[str, float], currencies: list[str]
+) -> dict[str, bytes]:
+    """
+    Matriz de precios de `cryptos` en cada divisa de `currencies` con tasa conocida,
+    calculadas todas con una sola multiplicación (divisas x criptos x PRICE_FIELDS).
+    """
+    currencies = [c for c in currencies if c in exchange]
+
+    if not cryptos or not currencies:
+        return {}
+
+    rates = np.array([exchange[c] for c in currencies], dtype=np.float64)
+    converted = price_matrix(cryptos)[np.newaxis, :, :] * rates[:, np.newaxis, np.newaxis]
+
+    return {
+        currency: matrix.astype(MATRIX_DTYPE, copy=False).tobytes()
+        for currency, matrix in zip(currencies, converted)
+    }
+
+
+def matrix_from_bytes(raw: bytes, rows: int) -> np.ndarray:
+    """
+    Primeras `rows` filas de una matriz guardada con price_matrices, sin copiar.
+    """
+    matrix = np.frombuffer(raw, dtype=MATRIX_DTYPE).reshape(-1, len(PRICE_FIELDS))
+    return matrix[:rows]
+
+
+def scale_history(series: HistorySeries, exchange: float) -> HistorySeries:
+    """
+    Equivalente a series.factor_price(exchange): multiplica la columna de precios sobre
+    el buffer de los arrays, sin pasar por floats de Python.
+    """
+    prices = array("d", bytes(len(series.prices) * 8))
+
+    if prices:
+        np.multiply(
+            np.frombuffer(series.prices, dtype=np.float64),
+            exchange,
+            out=np.frombuffer(prices, dtype=np.float64),
+        )
+
+    return HistorySeries(id=series.id, timestamps=series.timestamps, prices=prices)
@@ -1,33 +1,59 @@
 import requests
-import asyncio
 import httpx
+import asyncio
 import logging
 
-from cache import DataCache
+from cache import CacheItem, DataCache
+from async_cache import AsyncDataCache
 from models import ExchangeRate
+from http_client import ConditionalEndpoint
+from scheduler import Schedule, run_scheduled
 
 log = logging.getLogger(__name__)
 
 # En base a USD
 CURRENCY_EXCHANGE_API_URL = "https://cdn.jsdelivr.net/npm/@fawazahmed0/currency-api@2025.11.1/v1/currencies/usd.json"
+# Las tasas cambian una vez al día; con 304 cada consulta es barata
+EXCHANGE_SCHEDULE = Schedule(
+    "currency_exchange",
+    interval=600,
+    min_interval=300,
+    max_interval=3600,
+    requests_per_minute=6,
+)
+EXCHANGE_ENDPOINT = ConditionalEndpoint(
+    CURRENCY_EXCHANGE_API_URL, schedule=EXCHANGE_SCHEDULE
+)
 
 
 async def fetch_currency_exchange() -> dict | None:
     """
-    Obtener el cambio de moneda
+    Obtener el cambio de moneda. Retorna None si falla o si no cambió desde la última vez.
     """
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            log.info("Obteniendo cambio de moneda...")
+        log.info("Obteniendo cambio de moneda...")
+
+        cache = DataCache()
+
+        # La URL está fijada a una versión: sin las tasas en Redis los 304 no terminarían nunca
+        if not cache.has(CacheItem.CURRENCY_EXCHANGE):
+            EXCHANGE_ENDPOINT.forget()
+
+        response = await EXCHANGE_ENDPOINT.get()
+
+        if response is None:
+            log.info("Cambio de moneda sin cambios.")
+            return None
 
-            response = await client.get(CURRENCY_EXCHANGE_API_URL)
-            response.raise_for_status()
+        data = response.json()
 
-            data = response.json()
+        # save_exchange puede esperar el lock hasta LOCK_WAIT segundos: en un hilo para no
+        # frenar el event loop (renovación del lease, ingesta de precios).
+        # Si el lock descartó la escritura no se guardan los validadores
+        if await asyncio.to_thread(cache.save_exchange, data["usd"]):
+            EXCHANGE_ENDPOINT.remember(response)
 
-            cache = DataCache()
-            cache.save_exchange(data["usd"])
-            return data
+        return data
     except httpx.HTTPStatusError as e:
         log.error(f"HTTP Error obteniendo cambio de moneda: {e}")
     except Exception as e:
@@ -36,35 +62,39 @@ async def fetch_currency_exchange() -> dict | None:
     return None
 
 
-async def currency_exchange_worker(interval=600):
+async def currency_exchange_worker(lease=None):
     """
-    Actualizar el cambio de moneda
+    Actualizar el cambio de moneda, con el intervalo que ajusta EXCHANGE_SCHEDULE
 
     Args:
-        timeout (int): Tiempo de espera en segundos.
+        lease (LeaderLease): Si se indica, solo se actualiza mientras se es el líder.
     """
-    while True:
-        await fetch_currency_exchange()
-        await asyncio.sleep(interval)
+    await run_scheduled(EXCHANGE_SCHEDULE, fetch_currency_exchange, lease)
 
 
-def get_currency_exchange(target_currency="EUR") -> float:
+async def get_currency_exchange(target_currency="EUR") -> float:
     """
-    Obtener el cambio de moneda
+    Obtener el cambio de moneda.
+
+    Falla si no hay tasas o la divisa no existe: un factor de 0 dejaría todos los precios en 0.
     """
     log.info(f"Obteniendo cambio de moneda para {target_currency.upper()}...")
 
+    cache = AsyncDataCache()
+    exchange = await cache.get_exchange()
+
+    if not exchange:
+        raise ValueError("No hay tasas de cambio en el caché")
+
     try:
-        cache = DataCache()
-        return cache.get_exchange()[target_currency.lower()]
-    except Exception as e:
-        log.error(f"Error obteniendo cambio de moneda: {e}")
-        return 0
+        return exchange[target_currency.lower()]
+    except KeyError:
+        raise ValueError(f"Divisa desconocida: {target_currency}") from None
 
 
-def get_exchanges() -> list[ExchangeRate]:
-    cache = DataCache()
-    data = cache.get_exchange()
+async def get_exchanges() -> list[ExchangeRate]:
+    cache = AsyncDataCache()
+    data = await cache.get_exchange()
 
     if not data:
         return []
@@ -1,148 +1,369 @@
+import time
 import httpx
 import asyncio
 import requests
 import logging
+from array import array
 from datetime import datetime, timezone
-from typing import List
+from typing import AsyncIterator, List
 
-from models import CryptoCurrency, CryptoHistoryItem
+from utils import ProjectEnv
+from models import CryptoCurrency, CryptoHistoryItem, HistorySeries
 from currency_exchange import get_currency_exchange
-from cache import DataCache, MAX_HISTORY_SIZE
+from cache import CacheItem, DataCache, MAX_HISTORY_SIZE
+from async_cache import AsyncDataCache
+from rollups import ROLLUP_TIERS
+from downsample import lttb
+from conversion import price_matrices, scale_history
+from http_client import ConditionalEndpoint
+from scheduler import Schedule, run_scheduled
 
 log = logging.getLogger(__name__)
 
 
 BASE_CURRENCY = "usd"
-BASE_QUANTITY = 50
+# Cuántas criptos se ingieren por tick (top N por market cap)
+BASE_QUANTITY = int(ProjectEnv.RPC_INFO_COVERAGE)
+MAX_PAGE_SIZE = 250  # Máximo per_page de CoinGecko
+# Divisas con la matriz de precios precalculada en cada tick
+HOT_CURRENCIES = [
+    c.strip().lower() for c in ProjectEnv.RPC_INFO_HOT_CURRENCIES.split(",") if c.strip()
+]
+
+TICK_INTERVAL = 30  # Segundos entre ticks del historial crudo
+RAW_HISTORY_SPAN = MAX_HISTORY_SIZE * TICK_INTERVAL
+
+DEFAULT_RANGE_POINTS = 500
+MAX_RANGE_POINTS = 5000
+# Se lee como máximo este múltiplo de max_points antes de reducir con LTTB
+RANGE_OVERSAMPLING = 4
+
+# Puntos por mensaje de StreamPriceHistory
+DEFAULT_CHUNK_POINTS = 1000
+MAX_CHUNK_POINTS = 10000
+
+
+# El historial crudo se recorta por cantidad (MAX_HISTORY_SIZE puntos = 24 h a TICK_INTERVAL):
+# ticks más seguidos acortarían la ventana, así que el scheduler solo puede alargar el intervalo
+MARKETS_SCHEDULE = Schedule(
+    "coingecko",
+    interval=TICK_INTERVAL,
+    min_interval=TICK_INTERVAL,
+    max_interval=600,
+    requests_per_minute=ProjectEnv.RPC_INFO_COINGECKO_RPM,
+)
+MARKETS_ENDPOINT = ConditionalEndpoint(
+    "https://api.coingecko.com/api/v3/coins/markets", schedule=MARKETS_SCHEDULE
+)
+
+
+# Última página guardada de cada número de página, para reutilizarla si responde 304
+_last_pages: dict[int, list[CryptoCurrency]] = {}
+
+
+def coverage_pages(coverage: int = BASE_QUANTITY) -> list[dict]:
+    """
+    Parámetros de cada página necesaria para cubrir el top `coverage`.
+    """
+    per_page = min(coverage, MAX_PAGE_SIZE)
+    pages = -(-coverage // per_page)
+
+    return [
+        {
+            "vs_currency": BASE_CURRENCY,
+            "order": "market_cap_desc",
+            "per_page": per_page,
+            "page": page,
+        }
+        for page in range(1, pages + 1)
+    ]
 
 
 async def fetch_and_cache_data():
     """
     Obtiene los datos de criptomonedas de la API de CoinGecko y los guarda en un diccionario.
+
+    Las páginas se piden en paralelo (cada una consume presupuesto de MARKETS_SCHEDULE) y se
+    unen en un solo tick; si alguna falla el tick completo se descarta, para no guardar
+    un ranking a medias.
     """
 
-    url = "https://api.coingecko.com/api/v3/coins/markets"
-    params = {
-        "vs_currency": BASE_CURRENCY,
-        "order": "market_cap_desc",
-        "per_page": BASE_QUANTITY,
-        "page": 1,
-    }
+    pages = coverage_pages()
 
-    log.info("Obteniendo datos de criptomonedas de la API CoinGecko...")
+    log.info(
+        f"Obteniendo top {BASE_QUANTITY} criptomonedas ({len(pages)} páginas) de la API CoinGecko..."
+    )
 
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(url, params=params)
-            response.raise_for_status()
-
-            raw_data = response.json()
-            new_data = [CryptoCurrency.from_json(d) for d in raw_data]
-
-            # Get current UTC time as a timezone-aware datetime
-            # Convert to integer timestamp
-            utc_now = datetime.now(timezone.utc)
-            timestamp_int = int(utc_now.timestamp())
-
-            print(f"UTC Now: {utc_now}")
-            print(f"Timestamp: {timestamp_int}")
-
-            # Item de historial, precio e ID
-            history_item = [
-                CryptoHistoryItem(
-                    id=c.id,
-                    timestamp=timestamp_int,
-                    price=c.current_price,
-                )
-                for c in new_data
-            ]
-
-            cache = DataCache()
-            cache.save_crypto_data(new_data)
-            cache.save_crypto_history(history_item)
-
-            log.info(
-                f"Cache actualizada con {len(new_data)} criptomonedas en {BASE_CURRENCY.upper()}"
+        cache = DataCache()
+
+        # Si Redis perdió el snapshot, un tick de solo 304 no lo volvería a escribir
+        if not cache.has(CacheItem.CRYPTO_DATA):
+            MARKETS_ENDPOINT.forget()
+
+        responses = await asyncio.gather(*(MARKETS_ENDPOINT.get(p) for p in pages))
+
+        if all(r is None for r in responses):
+            log.info("Datos de criptomonedas sin cambios, se omite el tick.")
+            return
+
+        parsed = {}
+
+        for params, response in zip(pages, responses):
+            page = params["page"]
+
+            if response is not None:
+                parsed[page] = [CryptoCurrency.from_json(d) for d in response.json()]
+            elif page in _last_pages:
+                parsed[page] = _last_pages[page]
+            else:
+                raise ValueError(f"Página {page} sin cambios pero sin copia local")
+
+        # Entre páginas el ranking puede moverse: una cripto puede aparecer dos veces
+        new_data, seen = [], set()
+
+        for page in sorted(parsed):
+            for c in parsed[page]:
+                if c.id not in seen:
+                    seen.add(c.id)
+                    new_data.append(c)
+
+        new_data = new_data[:BASE_QUANTITY]
+
+        # Get current UTC time as a timezone-aware datetime
+        # Convert to integer timestamp
+        utc_now = datetime.now(timezone.utc)
+        timestamp_int = int(utc_now.timestamp())
+
+        print(f"UTC Now: {utc_now}")
+        print(f"Timestamp: {timestamp_int}")
+
+        # Item de historial, precio e ID
+        history_item = [
+            CryptoHistoryItem(
+                id=c.id,
+                timestamp=timestamp_int,
+                price=c.current_price,
             )
+            for c in new_data
+        ]
+
+        # Precios en las divisas más pedidas, para que el servidor no convierta en cada lectura.
+        # Sin tasas el tick se guarda igual y las lecturas convierten como siempre.
+        try:
+            prices = price_matrices(new_data, cache.get_exchange() or {}, HOT_CURRENCIES)
+        except Exception as e:
+            log.error(f"No se pudo precalcular la matriz de precios: {e}")
+            prices = {}
+
+        # Datos, historial, precios y versión en un solo round trip atómico
+        cache.commit_tick(new_data, history_item, timestamp_int, prices=prices)
+
+        for response in responses:
+            if response is not None:
+                MARKETS_ENDPOINT.remember(response)
+
+        _last_pages.update(parsed)
+
+        log.info(
+            f"Cache actualizada con {len(new_data)} criptomonedas en {BASE_CURRENCY.upper()}"
+        )
     except httpx.HTTPStatusError as e:
         log.error(f"HTTP Error obteniendo data: {e.response.status_code}")
     except Exception as e:
         log.error(f"Error obteniendo y guardando en cache los datos: {e}")
 
 
-async def crypto_data_worker(interval=60):
+async def crypto_data_worker(lease=None):
     """
     Función asíncrona que obtiene los datos de criptomonedas y los guarda en un diccionario.
+    El intervalo lo ajusta MARKETS_SCHEDULE según el presupuesto de CoinGecko.
 
     Args:
-        interval (int): Intervalo en segundos en el que se obtienen los datos de criptomonedas.
+        lease (LeaderLease): Si se indica, solo se obtienen datos mientras se es el líder.
     """
 
-    while True:
-        await fetch_and_cache_data()
-        await asyncio.sleep(interval)
+    await run_scheduled(MARKETS_SCHEDULE, fetch_and_cache_data, lease)
+
+
+async def get_cryptos_data(currency="usd", quantity=15) -> List[CryptoCurrency]:
+    cache = AsyncDataCache()
+    currency = currency.lower()
+
+    if currency in HOT_CURRENCIES:
+        converted = await cache.get_top_cryptos_in(currency, quantity)
 
+        if converted is not None:
+            return converted
 
-def get_cryptos_data(currency="usd", quantity=15) -> List[CryptoCurrency]:
-    cache = DataCache()
-    data = cache.get_crypto_data()[:quantity]
+    return await convert_cryptos(await cache.get_top_cryptos(quantity), currency, quantity)
+
+
+async def convert_cryptos(
+    data: List[CryptoCurrency], currency="usd", quantity=15
+) -> List[CryptoCurrency]:
+    """
+    Toma las primeras `quantity` criptos de un snapshot y las convierte a `currency`.
+    El snapshot no se modifica, puede estar compartido entre varios streams.
+    """
+    data = data[:quantity]
 
     log.info(f"Obteniendo {quantity} criptomonedas en {currency.upper()}...")
 
     if currency != BASE_CURRENCY and data:
-        exchange = get_currency_exchange(currency)
+        if currency.lower() in HOT_CURRENCIES:
+            converted = await AsyncDataCache().get_top_cryptos_in(currency.lower(), quantity)
+
+            # La matriz sirve solo si corresponde al mismo snapshot
+            if converted is not None and [c.id for c in converted] == [c.id for c in data]:
+                return converted
+
+        exchange = await get_currency_exchange(currency)
         data = [c.update_price_factor(exchange) for c in data]
 
     return data
 
 
-def get_history_data(
+def _history_size(history_size: int) -> int:
+    # history_size <= 0 retorna todo el historial disponible
+    if history_size <= 0:
+        return MAX_HISTORY_SIZE
+
+    return min(history_size, MAX_HISTORY_SIZE)
+
+
+async def get_history_data(
     crypto_id: str, history_size: int, target_currency: str
-) -> list[CryptoHistoryItem]:
+) -> HistorySeries:
     """
     Obtiene los últimos N puntos de precio para una cripto,
     aplicando la conversión de moneda si es necesario.
     """
 
-    cache = DataCache()
-    history_size = min(history_size, MAX_HISTORY_SIZE)
+    cache = AsyncDataCache()
+
+    # Leer solo los últimos N puntos de la cripto solicitada
+    history = await cache.get_crypto_history(crypto_id, _history_size(history_size))
+
+    # Sin divisa (campo vacío en el proto) se responde en BASE_CURRENCY
+    if target_currency and target_currency != BASE_CURRENCY:
+        exchange_factor = await get_currency_exchange(target_currency)
+        history = scale_history(history, exchange_factor)
+
+    return history
+
+
+async def get_history_batch(
+    crypto_ids: list[str], history_size: int, target_currency: str
+) -> dict[str, HistorySeries]:
+    """
+    Obtiene los últimos N puntos de varias criptos con una sola lectura del caché
+    y un solo factor de cambio.
+    """
+    cache = AsyncDataCache()
+
+    # Sin duplicados, conservando el orden
+    crypto_ids = list(dict.fromkeys(crypto_ids))
+    histories = await cache.get_crypto_histories(crypto_ids, _history_size(history_size))
+
+    # Sin divisa (campo vacío en el proto) se responde en BASE_CURRENCY
+    if target_currency and target_currency != BASE_CURRENCY:
+        exchange_factor = await get_currency_exchange(target_currency)
+        histories = {i: scale_history(h, exchange_factor) for i, h in histories.items()}
 
-    # Obtener los últimos N items del historial (Objetos CryptoHistoryItem)
-    history_items: list[CryptoHistoryItem] = cache.get_crypto_history()
-    history_items = list(filter(lambda item: item.id == crypto_id, history_items))
-    history_items = history_items[-history_size:]
+    return histories
 
-    if target_currency != BASE_CURRENCY:
-        exchange_factor = get_currency_exchange(target_currency)
-        history_items = [item.factor_price(exchange_factor) for item in history_items]
 
-    return history_items
+async def get_history_range(
+    crypto_id: str, start: int, end: int, max_points: int, target_currency: str
+) -> HistorySeries:
+    """
+    Obtiene el historial de una cripto entre `start` y `end` con a lo sumo `max_points` puntos.
 
+    Elige la fuente más fina que cubra el rango sin leer más de
+    RANGE_OVERSAMPLING * max_points puntos: el historial crudo o un rollup (precio de cierre
+    de cada bucket). Si aun así sobran puntos, se reducen con LTTB.
+    """
+    cache = AsyncDataCache()
+    now = int(time.time())
+
+    end = end if end > 0 else now
+    start = start if start > 0 else end - RAW_HISTORY_SPAN
+    max_points = min(max_points if max_points > 0 else DEFAULT_RANGE_POINTS, MAX_RANGE_POINTS)
+
+    if start > end:
+        return HistorySeries(id=crypto_id)
+
+    budget = max_points * RANGE_OVERSAMPLING
+    span = end - start
+    # Con el backend de segmentos el historial crudo cubre toda su retención
+    raw_span = cache.history_store.retention if cache.history_store else RAW_HISTORY_SPAN
+
+    if start >= now - raw_span and span // TICK_INTERVAL <= budget:
+        history = await cache.get_crypto_history_range(crypto_id, start, end)
+    else:
+        # Resolución más fina dentro del presupuesto que dé al menos max_points buckets;
+        # si ninguna cabe, la más gruesa que los dé, y si ninguna alcanza, la más fina
+        covering = [t for t in ROLLUP_TIERS if start >= now - t.retention] or [ROLLUP_TIERS[-1]]
+        enough = [t for t in covering if span // t.seconds >= max_points]
+        within = [t for t in enough if span // t.seconds <= budget]
+        tier = within[0] if within else (enough[-1] if enough else covering[0])
+
+        # Solo buckets que empiezan dentro del rango
+        buckets = await cache.get_rollup(crypto_id, tier, start, end)
+        history = HistorySeries(
+            id=crypto_id,
+            timestamps=array("q", (b.start for b in buckets)),
+            prices=array("d", (b.close for b in buckets)),
+        )
+
+    history = lttb(history, max_points)
+
+    # Sin divisa (campo vacío en el proto) se responde en BASE_CURRENCY
+    if target_currency and target_currency != BASE_CURRENCY:
+        exchange_factor = await get_currency_exchange(target_currency)
+        history = scale_history(history, exchange_factor)
+
+    return history
+
+
+async def stream_history_range(
+    crypto_id: str, start: int, end: int, chunk_size: int, target_currency: str
+) -> AsyncIterator[HistorySeries]:
+    """
+    Historial crudo de una cripto entre `start` y `end`, en partes de `chunk_size` puntos
+    leídas del historial a medida que se consumen, sin reducir ni armar la serie completa.
+    """
+    cache = AsyncDataCache()
+    raw_span = cache.history_store.retention if cache.history_store else RAW_HISTORY_SPAN
 
-def get_crypto_data(coin_id: str, currency="usd") -> CryptoCurrency:
-    # log.info(f"Obteniendo datos de {coin_id} en {currency.upper()}...")
+    end = end if end > 0 else int(time.time())
+    start = start if start > 0 else end - raw_span
+    chunk_size = min(chunk_size if chunk_size > 0 else DEFAULT_CHUNK_POINTS, MAX_CHUNK_POINTS)
 
-    # url = f"https://api.coingecko.com/api/v3/simple/price?ids={coin_id}&vs_currencies={currency}&include_24hr_change=true"
-    # response = requests.get(url)
-    # response.raise_for_status()
+    # Una sola tasa para todo el rango; si la divisa no existe falla antes del primer envío.
+    # Sin divisa (campo vacío en el proto) se responde en BASE_CURRENCY
+    exchange_factor = None
 
-    # log.info("Datos obtenidos exitosamente.")
+    if target_currency and target_currency != BASE_CURRENCY:
+        exchange_factor = await get_currency_exchange(target_currency)
 
-    # currency_exchange = get_currency_exchange(currency)
-    # data = Currency.from_json(response.json()[0])
+    async for chunk in cache.iter_crypto_history_range(crypto_id, start, end, chunk_size):
+        yield chunk if exchange_factor is None else scale_history(chunk, exchange_factor)
 
-    # return data.update_price_factor(currency_exchange)
-    cache = DataCache()
-    data = cache.get_crypto_data()
-    data = filter(lambda c: c.id == coin_id, data)
 
-    if not data:
-        raise Exception(f"No se encontraron datos para la cripto {coin_id}")
+async def get_crypto_data(coin_id: str, currency="usd") -> CryptoCurrency | None:
+    """
+    Obtiene una cripto por id. Retorna None si no está en el caché.
+    """
+    cache = AsyncDataCache()
+    data = await cache.get_crypto_by_id(coin_id)
 
-    data = list(data)[0]
+    if data is None:
+        return None
 
     if currency != BASE_CURRENCY:
-        exchange = get_currency_exchange(currency)
+        exchange = await get_currency_exchange(currency)
         data = data.update_price_factor(exchange)
 
     return data
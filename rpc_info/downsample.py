@@ -0,0 +1,65 @@
+"""
+Reducción de puntos del historial conservando la forma de la curva.
+"""
+
+from array import array
+
+from models import HistorySeries
+
+
+def lttb(series: HistorySeries, threshold: int) -> HistorySeries:
+    """
+    Largest-Triangle-Three-Buckets: reduce la serie a `threshold` puntos.
+
+    Conserva el primer y el último punto; de cada bucket intermedio elige el punto que
+    forma el triángulo de mayor área con el punto elegido anterior y el promedio del
+    bucket siguiente, así se mantienen picos y caídas que un muestreo uniforme perdería.
+    """
+    size = len(series)
+
+    if threshold >= size or threshold <= 0:
+        return series
+
+    # Con menos de 3 puntos no hay buckets intermedios: el último, o el primero y el último
+    if threshold < 3:
+        keep = slice(size - 1, None) if threshold == 1 else slice(0, None, size - 1)
+        return HistorySeries(
+            id=series.id,
+            timestamps=series.timestamps[keep],
+            prices=series.prices[keep],
+        )
+
+    xs, ys = series.timestamps, series.prices
+    timestamps, prices = array("q", [xs[0]]), array("d", [ys[0]])
+
+    every = (size - 2) / (threshold - 2)
+    a = 0
+
+    for i in range(threshold - 2):
+        # Promedio del bucket siguiente
+        avg_start = int((i + 1) * every) + 1
+        avg_end = min(int((i + 2) * every) + 1, size)
+        avg_len = avg_end - avg_start
+        avg_x = sum(xs[avg_start:avg_end]) / avg_len
+        avg_y = sum(ys[avg_start:avg_end]) / avg_len
+
+        # Punto del bucket actual con el triángulo de mayor área
+        range_start = int(i * every) + 1
+        range_end = int((i + 1) * every) + 1
+        ax, ay = xs[a], ys[a]
+        max_area, chosen = -1.0, range_start
+
+        for j in range(range_start, range_end):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+
+            if area > max_area:
+                max_area, chosen = area, j
+
+        timestamps.append(xs[chosen])
+        prices.append(ys[chosen])
+        a = chosen
+
+    timestamps.append(xs[-1])
+    prices.append(ys[-1])
+
+    return HistorySeries(id=series.id, timestamps=timestamps, prices=prices)
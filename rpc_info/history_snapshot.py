@@ -0,0 +1,202 @@
+"""
+Snapshots en disco del historial crudo, para recuperar las últimas 24 h si Redis se
+reinicia sin persistencia.
+
+Formato del archivo (little-endian), pensado para leerse con mmap sin parsear:
+
+    cabecera  SNAPSHOT_HEADER: magic, versión, cantidad de series, timestamp de creación
+    índice    SNAPSHOT_ENTRY por serie: id (utf-8, hasta 64 bytes), offset, cantidad de puntos
+    datos     por serie, `cantidad` timestamps int64 seguidos de `cantidad` precios float64
+
+Cabecera e índice miden múltiplos de 8 bytes, así cada columna queda alineada y se puede
+leer con memoryview.cast directamente sobre el mmap.
+
+La llave CacheItem.HISTORY_SNAPSHOT marca que el historial en Redis ya incluye el
+snapshot; si falta (Redis arrancó vacío) se restaura el archivo antes de seguir.
+"""
+
+import os
+import sys
+import mmap
+import time
+import struct
+import asyncio
+import logging
+import tempfile
+from array import array
+
+from utils import ProjectEnv
+from models import HistorySeries
+from cache import DataCache
+from leader import LeaderLease
+
+log = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"RPCHIST\0"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct("<8sIIq")
+SNAPSHOT_ENTRY = struct.Struct("<64sqq")
+SNAPSHOT_INTERVAL = 300
+
+SNAPSHOT_PATH = ProjectEnv.RPC_INFO_HISTORY_SNAPSHOT or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "data", "history.snap"
+)
+
+
+def write_snapshot(series: list[HistorySeries], path: str, created: int) -> int:
+    """
+    Escribe las series en `path` de forma atómica (archivo temporal + rename).
+    El temporal tiene nombre único, así dos procesos no escriben sobre el mismo.
+    Retorna el tamaño del archivo en bytes.
+    """
+    series = [s for s in series if len(s)]
+    offset = SNAPSHOT_HEADER.size + SNAPSHOT_ENTRY.size * len(series)
+
+    header = [SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(series), created)]
+    data = []
+
+    for s in series:
+        header.append(SNAPSHOT_ENTRY.pack(s.id.encode(), offset, len(s)))
+        timestamps, prices = s.timestamps, s.prices
+
+        if sys.byteorder != "little":
+            timestamps, prices = array("q", timestamps), array("d", prices)
+            timestamps.byteswap()
+            prices.byteswap()
+
+        data += [timestamps.tobytes(), prices.tobytes()]
+        offset += 16 * len(s)
+
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=f"{os.path.basename(path)}.", suffix=".tmp")
+
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.writelines(header)
+            f.writelines(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+    return offset
+
+
+def read_snapshot(path: str) -> tuple[int, list[HistorySeries]]:
+    """
+    Lee un snapshot con mmap. Retorna (timestamp de creación, series).
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        view = memoryview(mm)
+
+        try:
+            magic, version, count, created = SNAPSHOT_HEADER.unpack_from(view)
+
+            if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+                raise ValueError(f"Snapshot inválido: {path}")
+
+            series = []
+
+            for i in range(count):
+                raw_id, offset, size = SNAPSHOT_ENTRY.unpack_from(
+                    view, SNAPSHOT_HEADER.size + i * SNAPSHOT_ENTRY.size
+                )
+                end = offset + 16 * size
+
+                if end > len(view):
+                    raise ValueError(f"Snapshot truncado: {path}")
+
+                timestamps = array("q", view[offset : offset + 8 * size].cast("q"))
+                prices = array("d", view[offset + 8 * size : end].cast("d"))
+
+                if sys.byteorder != "little":
+                    timestamps.byteswap()
+                    prices.byteswap()
+
+                series.append(
+                    HistorySeries(
+                        id=raw_id.rstrip(b"\0").decode(),
+                        timestamps=timestamps,
+                        prices=prices,
+                    )
+                )
+
+            return created, series
+        finally:
+            view.release()
+
+
+def take_snapshot(cache: DataCache, path: str = SNAPSHOT_PATH) -> int:
+    """
+    Guarda el historial crudo de todas las criptos en `path`. Retorna la cantidad de series.
+    """
+    created = int(time.time())
+    series = list(cache.get_crypto_histories(sorted(cache.get_history_ids())).values())
+    size = write_snapshot(series, path, created)
+    cache.set_snapshot_marker(created)
+
+    log.info(f"Snapshot del historial guardado: {len(series)} series, {size} bytes")
+    return len(series)
+
+
+def restore_if_needed(cache: DataCache, path: str = SNAPSHOT_PATH) -> int:
+    """
+    Restaura el snapshot si el historial de Redis no lo incluye (Redis reiniciado o
+    restaurado desde un respaldo anterior). Retorna la cantidad de puntos restaurados.
+    """
+    if cache.get_snapshot_marker() is not None or not os.path.exists(path):
+        return 0
+
+    started = time.perf_counter()
+
+    try:
+        created, series = read_snapshot(path)
+    except (OSError, ValueError, struct.error) as e:
+        log.error(f"No se pudo leer el snapshot del historial: {e}")
+        return 0
+
+    restored = cache.restore_history(series)
+    cache.set_snapshot_marker(created)
+
+    log.info(
+        f"Historial restaurado desde {path}: {len(series)} series, {restored} puntos "
+        f"en {time.perf_counter() - started:.2f}s"
+    )
+    return restored
+
+
+async def history_snapshot_worker(
+    interval=SNAPSHOT_INTERVAL,
+    path: str = SNAPSHOT_PATH,
+    lease: LeaderLease | None = None,
+):
+    """
+    Cada `interval` segundos restaura el snapshot si Redis lo perdió, o guarda uno nuevo.
+    Con `lease` solo lo hace mientras esta instancia sea el líder; al arrancar (o al
+    asumir el liderazgo) intenta restaurar de inmediato, sin esperar el intervalo.
+    """
+    cache = DataCache()
+    restore_now = True
+
+    while True:
+        if not restore_now:
+            await asyncio.sleep(interval)
+
+        if lease is not None and not lease.is_leader:
+            await lease.wait_until_leader()
+            restore_now = True
+            continue
+
+        only_restore, restore_now = restore_now, False
+
+        try:
+            restored = await asyncio.to_thread(restore_if_needed, cache, path)
+
+            if not restored and not only_restore:
+                await asyncio.to_thread(take_snapshot, cache, path)
+        except Exception as e:
+            log.error(f"Error en el snapshot del historial: {e}")
@@ -0,0 +1,140 @@
+"""
+Cliente HTTP compartido por los workers para consultar las APIs externas.
+
+Un solo httpx.AsyncClient por proceso mantiene las conexiones abiertas entre ticks,
+evitando el handshake TCP + TLS en cada consulta. Usa HTTP/2 si el paquete `h2`
+está instalado (pip install httpx[http2]).
+
+ConditionalEndpoint envía If-None-Match / If-Modified-Since con los validadores de la
+última respuesta guardada; si el servidor responde 304 no se descarga ni se procesa nada.
+Si tiene un Schedule (scheduler.py), cada petición consume su presupuesto y le reporta
+el resultado.
+"""
+
+import time
+import httpx
+import logging
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from importlib.util import find_spec
+
+from scheduler import Schedule
+
+log = logging.getLogger(__name__)
+
+HTTP2 = find_spec("h2") is not None
+
+_client: httpx.AsyncClient | None = None
+
+
+def get_client() -> httpx.AsyncClient:
+    global _client
+
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=10.0,
+            http2=HTTP2,
+            limits=httpx.Limits(max_keepalive_connections=10, keepalive_expiry=120),
+        )
+        log.info(f"Cliente HTTP creado (HTTP/2: {'sí' if HTTP2 else 'no'})")
+
+    return _client
+
+
+async def close_client():
+    global _client
+
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def retry_after(response: httpx.Response) -> float | None:
+    """
+    Segundos indicados por la cabecera Retry-After, en segundos o como fecha HTTP.
+    """
+    value = response.headers.get("retry-after")
+
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        when = parsedate_to_datetime(value)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class ConditionalEndpoint:
+    def __init__(self, url: str, schedule: Schedule | None = None):
+        self.url = url
+        self.schedule = schedule
+        # URL completa (con parámetros) -> cabeceras condicionales
+        self._validators: dict[str, dict[str, str]] = {}
+
+    async def get(self, params: dict | None = None) -> httpx.Response | None:
+        """
+        GET condicional. Retorna None si el recurso no cambió desde la última
+        respuesta marcada con `remember`.
+        """
+        key = str(httpx.URL(self.url, params=params))
+
+        if self.schedule is not None:
+            await self.schedule.acquire()
+
+        started = time.monotonic()
+
+        try:
+            response = await get_client().get(
+                self.url, params=params, headers=self._validators.get(key, {})
+            )
+        except httpx.TransportError:
+            if self.schedule is not None:
+                self.schedule.record(None, time.monotonic() - started)
+            raise
+
+        if self.schedule is not None:
+            self.schedule.record(
+                response.status_code, time.monotonic() - started, retry_after(response)
+            )
+
+        if response.status_code == 304:
+            return None
+
+        response.raise_for_status()
+        return response
+
+    def remember(self, response: httpx.Response):
+        """
+        Guarda los validadores de `response`. Se llama solo después de persistir los
+        datos, para no saltar un payload que nunca llegó a Redis.
+        """
+        headers = {}
+
+        if etag := response.headers.get("etag"):
+            headers["If-None-Match"] = etag
+
+        if last_modified := response.headers.get("last-modified"):
+            headers["If-Modified-Since"] = last_modified
+
+        key = str(response.request.url)
+
+        if headers:
+            self._validators[key] = headers
+        else:
+            self._validators.pop(key, None)
+
+    def forget(self):
+        """
+        Descarta los validadores: la próxima petición trae el payload completo.
+        Se llama cuando Redis perdió los datos (reinicio sin persistencia, FLUSH), porque
+        un 304 no trae con qué volver a escribirlos.
+        """
+        if self._validators:
+            log.warning(f"Datos de {self.url} ausentes en Redis, se descartan los validadores")
+            self._validators.clear()
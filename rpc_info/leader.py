@@ -0,0 +1,63 @@
+"""
+Elección de líder entre instancias de workers.py con un lease renovable en Redis.
+
+Solo el líder consulta las APIs externas; las demás instancias quedan en espera
+renovando su intento cada LEASE_TTL / 3 segundos. Si el líder muere, su lease expira
+y una instancia en espera toma el control en a lo sumo LEASE_TTL + LEASE_TTL / 3 segundos.
+"""
+
+import os
+import uuid
+import socket
+import asyncio
+import logging
+
+from cache import DataCache
+
+log = logging.getLogger(__name__)
+
+LEASE_TTL = 15
+
+
+class LeaderLease:
+    def __init__(self, cache: DataCache | None = None, ttl: float = LEASE_TTL):
+        self.cache = cache or DataCache()
+        self.ttl = ttl
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._leading = asyncio.Event()
+
+    @property
+    def is_leader(self) -> bool:
+        return self._leading.is_set()
+
+    async def wait_until_leader(self):
+        await self._leading.wait()
+
+    async def run(self):
+        """
+        Adquiere o renueva el lease periódicamente hasta que se cancele la tarea.
+        """
+        log.info(f"Worker {self.worker_id} esperando el lease de líder...")
+
+        try:
+            while True:
+                try:
+                    leading = self.cache.acquire_lease(self.worker_id, self.ttl)
+                except Exception as e:
+                    # Sin poder renovar no hay garantía de seguir siendo líder
+                    log.error(f"Error renovando el lease: {e}")
+                    leading = False
+
+                if leading and not self.is_leader:
+                    log.info(f"Worker {self.worker_id} es el líder.")
+                    self._leading.set()
+                elif not leading and self.is_leader:
+                    log.warning(f"Worker {self.worker_id} perdió el lease, queda en espera.")
+                    self._leading.clear()
+
+                await asyncio.sleep(self.ttl / 3)
+        finally:
+            if self.is_leader:
+                self._leading.clear()
+                self.cache.release_lease(self.worker_id)
+                log.info(f"Worker {self.worker_id} liberó el lease.")
@@ -0,0 +1,95 @@
+"""
+Notificaciones de actualización del caché para los streams del servidor.
+
+El worker publica en CacheItem.CRYPTO_UPDATES dentro de la transacción de cada tick.
+Una sola tarea por proceso escucha el canal, decodifica el snapshot una vez y despierta
+a todos los streams suscritos, que comparten la misma lista.
+"""
+
+import asyncio
+import logging
+from typing import AsyncIterator
+
+from models import CryptoCurrency
+from cache import CacheItem
+from async_cache import AsyncDataCache
+
+log = logging.getLogger(__name__)
+
+# Si no llega ninguna notificación en este tiempo se revisa la versión de todas formas
+FALLBACK_INTERVAL = 60
+MAX_RECONNECT_DELAY = 30
+
+
+class CryptoUpdates:
+    def __init__(self, cache: AsyncDataCache | None = None):
+        self.cache = cache or AsyncDataCache()
+        self.snapshot: list[CryptoCurrency] | None = None
+        self.sequence = 0
+        self._condition = asyncio.Condition()
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def subscribe(self) -> AsyncIterator[list[CryptoCurrency]]:
+        """
+        Entrega el snapshot actual y luego uno nuevo por cada tick confirmado.
+        """
+        seen = 0
+
+        while True:
+            async with self._condition:
+                await self._condition.wait_for(
+                    lambda: self.sequence != seen and self.snapshot is not None
+                )
+                seen, snapshot = self.sequence, self.snapshot
+
+            yield snapshot
+
+    async def _refresh(self):
+        # Con la caché local de versiones, un tick sin cambios retorna la misma lista
+        data = await self.cache.get_crypto_data()
+
+        if data and data is not self.snapshot:
+            async with self._condition:
+                self.snapshot = data
+                self.sequence += 1
+                self._condition.notify_all()
+
+    async def _listen(self):
+        delay = 1
+
+        while True:
+            pubsub = self.cache.redis.pubsub()
+
+            try:
+                await pubsub.subscribe(CacheItem.CRYPTO_UPDATES.value)
+                log.info("Escuchando actualizaciones del caché...")
+                delay = 1
+
+                await self._refresh()
+
+                while True:
+                    await pubsub.get_message(
+                        ignore_subscribe_messages=True, timeout=FALLBACK_INTERVAL
+                    )
+                    await self._refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.error(f"Error escuchando actualizaciones, reintentando en {delay}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_RECONNECT_DELAY)
+            finally:
+                await pubsub.aclose()
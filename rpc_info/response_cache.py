@@ -0,0 +1,72 @@
+"""
+Respuestas unarias ya serializadas, para no reconstruir los Proto en cada llamada.
+
+GetTopCryptos, GetCryptoById y GetExchangeRates solo cambian cuando el worker confirma un
+tick o nuevas tasas de cambio. Cada respuesta se guarda como bytes con una llave
+(método, parámetros) y vale mientras no cambie ninguna de las dos versiones del caché;
+apenas cambia una se descartan todas. register_service envía los bytes sin volver a
+serializar.
+
+En modo degradado no hay versión con qué validar, así que no se guarda ni se lee nada y
+las respuestas salen del snapshot local como siempre.
+"""
+
+from collections import OrderedDict
+
+from async_cache import AsyncDataCache
+
+RESPONSE_CACHE_SIZE = 1024  # Respuestas por versión; las menos usadas salen primero
+
+
+class ResponseCache:
+    def __init__(self, cache: AsyncDataCache | None = None, max_entries=RESPONSE_CACHE_SIZE):
+        self.cache = cache or AsyncDataCache()
+        self.max_entries = max_entries
+        self.stats = {"hits": 0, "misses": 0}
+        self._version: tuple | None = None
+        self._entries: OrderedDict[tuple, bytes] = OrderedDict()
+
+    async def version(self) -> tuple | None:
+        """
+        Versión actual de los datos, o None si las respuestas no se deben guardar
+        (Redis no responde o todavía no hay datos). Si cambió, invalida todo lo guardado.
+        """
+        version = await self.cache.get_versions()
+
+        if version is None or None in version:
+            return None
+
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
+
+        return version
+
+    def get(self, key: tuple, version: tuple | None) -> bytes | None:
+        if version is None or version != self._version:
+            return None
+
+        message = self._entries.get(key)
+
+        if message is None:
+            self.stats["misses"] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return message
+
+    def put(self, key: tuple, version: tuple | None, message) -> bytes:
+        """
+        Serializa `message` y lo guarda para `version`. Retorna los bytes para enviarlos.
+        """
+        message = message.SerializeToString()
+
+        # Si la versión cambió mientras se armaba la respuesta, ya no sirve guardarla
+        if version is not None and version == self._version:
+            self._entries[key] = message
+
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return message
@@ -0,0 +1,117 @@
+"""
+Rollups OHLC del historial de precios.
+
+Cada tick de ingesta actualiza, dentro de la misma transacción que commit_tick,
+el bucket actual de cada resolución (1m, 5m, 1h, 1d). Así el historial largo se
+construye de forma incremental mientras el historial crudo se recorta a MAX_HISTORY_SIZE.
+
+Cada bucket es un miembro JSON [start, open, high, low, close, volume, last_ts]
+de un sorted set por resolución y cripto, con score = start.
+"""
+
+import json
+import logging
+from dataclasses import dataclass
+
+log = logging.getLogger(__name__)
+
+DAY = 24 * 60 * 60
+
+
+@dataclass(frozen=True)
+class RollupTier:
+    name: str
+    seconds: int  # Tamaño del bucket
+    retention: int  # Segundos que se conservan
+
+    @property
+    def max_buckets(self) -> int:
+        return self.retention // self.seconds
+
+
+# De la resolución más fina a la más gruesa
+ROLLUP_TIERS = (
+    RollupTier("1m", 60, 2 * DAY),
+    RollupTier("5m", 5 * 60, 14 * DAY),
+    RollupTier("1h", 60 * 60, 180 * DAY),
+    RollupTier("1d", DAY, 5 * 365 * DAY),
+)
+
+TIERS_BY_NAME = {tier.name: tier for tier in ROLLUP_TIERS}
+
+
+@dataclass
+class RollupBucket:
+    start: int  # Unix timestamp del inicio del bucket
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float  # Último volumen 24h reportado dentro del bucket
+
+    @classmethod
+    def from_member(cls, raw: bytes) -> "RollupBucket":
+        start, open_, high, low, close, volume, _ = json.loads(raw)
+        return cls(int(start), open_, high, low, close, volume)
+
+
+# KEYS: una llave por (cripto, resolución)
+# ARGV: timestamp, y por cada llave: tamaño del bucket, retención, precio, volumen
+ROLLUP_SCRIPT = """
+local ts = tonumber(ARGV[1])
+
+for i, key in ipairs(KEYS) do
+    local base = 1 + (i - 1) * 4
+    local size = tonumber(ARGV[base + 1])
+    local retention = tonumber(ARGV[base + 2])
+    local price = tonumber(ARGV[base + 3])
+    local volume = tonumber(ARGV[base + 4])
+    local start = ts - (ts % size)
+
+    local current = redis.call("ZRANGEBYSCORE", key, start, start)
+    local bucket
+
+    if #current > 0 then
+        bucket = cjson.decode(current[1])
+        redis.call("ZREM", key, current[1])
+
+        bucket[3] = math.max(bucket[3], price)
+        bucket[4] = math.min(bucket[4], price)
+
+        -- Un tick atrasado no reemplaza el cierre de uno más reciente
+        if ts >= bucket[7] then
+            bucket[5] = price
+            bucket[6] = volume
+            bucket[7] = ts
+        end
+    else
+        bucket = {start, price, price, price, price, volume, ts}
+    end
+
+    redis.call("ZADD", key, start, cjson.encode(bucket))
+    redis.call("ZREMRANGEBYSCORE", key, "-inf", "(" .. (ts - retention))
+end
+
+return #KEYS
+"""
+
+
+def rollup_args(
+    keys_for, points: list[tuple[str, float, float]], timestamp: int
+) -> tuple[list[str], list]:
+    """
+    Arma KEYS y ARGV de ROLLUP_SCRIPT para un tick.
+
+    args:
+        keys_for: Función (crypto_id, tier) -> llave del rollup.
+        points (list): Tuplas (crypto_id, precio, volumen).
+        timestamp (int): Unix timestamp del tick.
+    """
+    keys, args = [], [timestamp]
+
+    for crypto_id, price, volume in points:
+        for tier in ROLLUP_TIERS:
+            keys.append(keys_for(crypto_id, tier))
+            args.extend((tier.seconds, tier.retention, price, volume or 0))
+
+    return keys, args
@@ -0,0 +1,155 @@
+"""
+Planificación adaptativa de los workers según el presupuesto de cada API externa.
+
+Cada API tiene un Schedule con un presupuesto de peticiones por minuto (token bucket).
+ConditionalEndpoint toma una ficha antes de cada petición y reporta el resultado:
+
+- Con 429, 5xx o error de red se aplica backoff exponencial con jitter, respetando Retry-After.
+- Con respuestas lentas se alarga el intervalo.
+- Mientras todo va bien el intervalo baja hasta el mínimo que permite el presupuesto,
+  usando solo una fracción (HEADROOM) para no rozar el límite.
+
+El estado de cada Schedule se publica en Redis (DataCache.get_schedule).
+"""
+
+import time
+import random
+import asyncio
+import logging
+
+from cache import DataCache
+
+log = logging.getLogger(__name__)
+
+HEADROOM = 0.8
+JITTER = 0.1
+# Una respuesta más lenta que esto indica que la API está bajo carga
+SLOW_RESPONSE = 5.0
+
+
+class Schedule:
+    def __init__(
+        self,
+        name: str,
+        interval: float,
+        min_interval: float,
+        max_interval: float,
+        requests_per_minute: float,
+    ):
+        self.name = name
+        self.base_interval = interval
+        self.interval = interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.requests_per_minute = float(requests_per_minute)
+
+        self.tokens = self.requests_per_minute
+        self.failures = 0
+        self.last_status: int | None = None
+        self.last_latency: float | None = None
+        self._refilled = time.monotonic()
+        self._blocked_until = 0.0
+        self._tick_requests = 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(
+            self.requests_per_minute,
+            self.tokens + (now - self._refilled) * self.requests_per_minute / 60,
+        )
+        self._refilled = now
+
+    async def acquire(self):
+        """
+        Espera una ficha del presupuesto y a que venza cualquier Retry-After.
+        """
+        while True:
+            blocked = self._blocked_until - time.monotonic()
+
+            if blocked > 0:
+                await asyncio.sleep(blocked)
+                continue
+
+            self._refill()
+
+            if self.tokens >= 1:
+                self.tokens -= 1
+                self._tick_requests += 1
+                return
+
+            await asyncio.sleep((1 - self.tokens) * 60 / self.requests_per_minute)
+
+    def record(self, status: int | None, latency: float, retry_after: float | None = None):
+        """
+        Registra el resultado de una petición. `status` es None si hubo error de red.
+        """
+        self.last_status = status
+        self.last_latency = latency
+
+        if status is not None and status < 400:
+            self.failures = 0
+
+            if latency > SLOW_RESPONSE:
+                self.interval = min(self.max_interval, self.interval * 1.5)
+            return
+
+        self.failures += 1
+        self.interval = min(self.max_interval, self.base_interval * 2**self.failures)
+
+        if retry_after:
+            self.interval = max(self.interval, retry_after)
+            self._blocked_until = time.monotonic() + retry_after
+
+        log.warning(
+            f"{self.name}: respuesta {status or 'sin respuesta'}, "
+            f"siguiente intento en ~{self.interval:.0f}s"
+        )
+
+    def next_delay(self) -> float:
+        """
+        Segundos hasta el siguiente tick. Sin errores el intervalo baja gradualmente
+        hasta el mínimo que sostiene el presupuesto con las peticiones del último tick.
+        """
+        if self.failures == 0 and (
+            self.last_latency is None or self.last_latency <= SLOW_RESPONSE
+        ):
+            floor = max(
+                self.min_interval,
+                60 * max(self._tick_requests, 1) / (self.requests_per_minute * HEADROOM),
+            )
+            self.interval = max(floor, min(self.interval * 0.8, self.max_interval))
+
+        self._tick_requests = 0
+        return self.interval * random.uniform(1 - JITTER, 1 + JITTER)
+
+    def snapshot(self, delay: float) -> dict:
+        self._refill()
+        return {
+            "interval": round(self.interval, 2),
+            "next_run": time.time() + delay,
+            "requests_per_minute": self.requests_per_minute,
+            "tokens": round(self.tokens, 2),
+            "failures": self.failures,
+            "last_status": self.last_status,
+            "last_latency": self.last_latency,
+        }
+
+
+async def run_scheduled(schedule: Schedule, fetch, lease=None):
+    """
+    Ejecuta `fetch` en bucle con los intervalos de `schedule`.
+    Si se indica `lease`, solo mientras se es el líder.
+    """
+    while True:
+        if lease is not None:
+            await lease.wait_until_leader()
+
+        await fetch()
+        delay = schedule.next_delay()
+
+        try:
+            DataCache().save_schedule(schedule.name, schedule.snapshot(delay))
+        except Exception as e:
+            log.error(f"Error guardando el estado de {schedule.name}: {e}")
+
+        await asyncio.sleep(delay)
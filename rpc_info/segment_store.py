@@ -0,0 +1,298 @@
+"""
+Historial en archivos de segmentos append-only, alternativa a Redis para retención larga.
+
+Cada cripto tiene un directorio con segmentos de registros de ancho fijo HISTORY_RECORD
+(int64 timestamp + float64 precio, 16 bytes), ordenados por timestamp. El nombre de cada
+segmento es el timestamp de su primer punto; al llegar a SEGMENT_POINTS registros se
+abre uno nuevo y los segmentos más viejos que la retención se borran completos.
+
+Las lecturas mapean el segmento con mmap y buscan por timestamp con búsqueda binaria
+sobre la columna de timestamps (una vista con stride del mapeo, sin copiar). Solo se
+copia el tramo pedido al armar la HistorySeries.
+
+Los workers escriben y el servidor lee los mismos archivos, así que deben compartir el
+directorio (mismo host o volumen).
+"""
+
+import os
+import sys
+import mmap
+import bisect
+import logging
+from array import array
+from typing import Iterator
+from urllib.parse import quote, unquote
+
+from utils import ProjectEnv
+from models import CryptoHistoryItem, HistorySeries
+from cache import HISTORY_RECORD
+
+log = logging.getLogger(__name__)
+
+SEGMENT_POINTS = 65536  # ~22 días a un punto cada 30 s, 1 MiB por segmento
+SEGMENT_RETENTION = 365 * 24 * 60 * 60
+SEGMENT_SUFFIX = ".seg"
+
+SEGMENTS_DIR = ProjectEnv.RPC_INFO_HISTORY_SEGMENTS_DIR or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "data", "segments"
+)
+
+
+class SegmentHistoryStore:
+    def __init__(
+        self,
+        root: str,
+        segment_points: int = SEGMENT_POINTS,
+        retention: int = SEGMENT_RETENTION,
+    ):
+        self.root = root
+        self.segment_points = segment_points
+        self.retention = retention
+        os.makedirs(root, exist_ok=True)
+
+    def _dir(self, crypto_id: str) -> str:
+        return os.path.join(self.root, quote(crypto_id, safe=""))
+
+    def _segments(self, crypto_id: str) -> list[tuple[int, str]]:
+        """
+        Segmentos de una cripto como (timestamp inicial, ruta), del más viejo al más nuevo.
+        """
+        directory = self._dir(crypto_id)
+
+        try:
+            names = os.listdir(directory)
+        except FileNotFoundError:
+            return []
+
+        return sorted(
+            (int(name[: -len(SEGMENT_SUFFIX)]), os.path.join(directory, name))
+            for name in names
+            if name.endswith(SEGMENT_SUFFIX)
+        )
+
+    def _tail(self, crypto_id: str) -> tuple[str | None, int, int]:
+        """
+        Segmento activo de una cripto: (ruta, registros, último timestamp).
+        Se lee del disco en cada escritura, así un nuevo líder continúa donde quedó el anterior.
+        """
+        segments = self._segments(crypto_id)
+
+        if not segments:
+            return None, 0, -1
+
+        path = segments[-1][1]
+        count = os.path.getsize(path) // HISTORY_RECORD.size
+
+        if not count:
+            return path, 0, -1
+
+        with open(path, "rb") as f:
+            f.seek((count - 1) * HISTORY_RECORD.size)
+            last, _ = HISTORY_RECORD.unpack(f.read(HISTORY_RECORD.size))
+
+        return path, count, last
+
+    def add_points(self, crypto_id: str, points) -> int:
+        """
+        Agrega puntos (timestamp, precio) al final de la serie. Los puntos con timestamp
+        igual o anterior al último guardado se descartan: los segmentos son append-only.
+        Retorna la cantidad de puntos agregados.
+        """
+        path, count, last = self._tail(crypto_id)
+        pending = {}  # ruta -> registros a escribir
+
+        for timestamp, price in sorted(points):
+            if timestamp <= last:
+                continue
+
+            if path is None or count >= self.segment_points:
+                os.makedirs(self._dir(crypto_id), exist_ok=True)
+                path = os.path.join(self._dir(crypto_id), f"{timestamp}{SEGMENT_SUFFIX}")
+                count = 0
+                self._expire(crypto_id, timestamp)
+
+            pending.setdefault(path, bytearray()).extend(
+                HISTORY_RECORD.pack(timestamp, price)
+            )
+            count, last = count + 1, timestamp
+
+        for segment, records in pending.items():
+            with open(segment, "ab") as f:
+                f.write(records)
+
+        return sum(len(r) for r in pending.values()) // HISTORY_RECORD.size
+
+    def add_tick(self, snapshot: list[CryptoHistoryItem]) -> int:
+        return sum(
+            self.add_points(item.id, [(item.timestamp, item.price)]) for item in snapshot
+        )
+
+    def _expire(self, crypto_id: str, now: int):
+        """
+        Borra los segmentos cuyo último punto quedó fuera de la retención.
+        """
+        segments = self._segments(crypto_id)
+
+        # El último punto de un segmento es anterior al inicio del siguiente
+        for (_, path), (next_start, _) in zip(segments, segments[1:]):
+            if next_start < now - self.retention:
+                os.remove(path)
+                log.info(f"Segmento expirado: {path}")
+
+    def ids(self) -> set[str]:
+        return {unquote(name) for name in os.listdir(self.root)}
+
+    def _read(
+        self, path: str, start: int | None = None, end: int | None = None, last: int | None = None
+    ) -> tuple[array, array]:
+        """
+        Lee de un segmento los puntos con timestamp en [start, end], o los últimos `last`.
+        """
+        timestamps, prices = array("q"), array("d")
+
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            size -= size % HISTORY_RECORD.size
+
+            if not size:
+                return timestamps, prices
+
+            with (
+                mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as mm,
+                memoryview(mm) as words,
+                words.cast("q") as ts_words,
+                words.cast("d") as price_words,
+            ):
+                # Columnas con stride sobre el mapeo: [timestamp, precio, timestamp, ...]
+                ts_column, price_column = ts_words[0::2], price_words[1::2]
+
+                if last is not None:
+                    lo, hi = max(0, len(ts_column) - last), len(ts_column)
+                else:
+                    lo = bisect.bisect_left(ts_column, start)
+                    hi = bisect.bisect_right(ts_column, end)
+
+                timestamps.frombytes(ts_column[lo:hi].tobytes())
+                prices.frombytes(price_column[lo:hi].tobytes())
+                ts_column.release()
+                price_column.release()
+
+        if sys.byteorder != "little":
+            timestamps.byteswap()
+            prices.byteswap()
+
+        return timestamps, prices
+
+    def get_crypto_history(self, crypto_id: str, size: int) -> HistorySeries:
+        """
+        Últimos `size` puntos de una cripto, del más antiguo al más reciente.
+        """
+        series = HistorySeries(id=crypto_id)
+
+        if size <= 0:
+            return series
+
+        parts = []
+
+        for _, path in reversed(self._segments(crypto_id)):
+            timestamps, prices = self._read(path, last=size)
+            parts.append((timestamps, prices))
+            size -= len(timestamps)
+
+            if size <= 0:
+                break
+
+        for timestamps, prices in reversed(parts):
+            series.timestamps.extend(timestamps)
+            series.prices.extend(prices)
+
+        return series
+
+    def get_crypto_histories(
+        self, crypto_ids: list[str], size: int
+    ) -> dict[str, HistorySeries]:
+        return {i: self.get_crypto_history(i, size) for i in crypto_ids}
+
+    def get_crypto_history_range(self, crypto_id: str, start: int, end: int) -> HistorySeries:
+        """
+        Puntos de una cripto con timestamp entre `start` y `end` (inclusive).
+        """
+        series = HistorySeries(id=crypto_id)
+        segments = self._segments(crypto_id)
+
+        for i, (first, path) in enumerate(segments):
+            following = segments[i + 1][0] if i + 1 < len(segments) else None
+
+            if first > end or (following is not None and following <= start):
+                continue
+
+            timestamps, prices = self._read(path, start, end)
+            series.timestamps.extend(timestamps)
+            series.prices.extend(prices)
+
+        return series
+
+    def iter_history_range(
+        self, crypto_id: str, start: int, end: int, chunk_size: int
+    ) -> Iterator[HistorySeries]:
+        """
+        Igual que get_crypto_history_range, pero en series de a lo sumo `chunk_size` puntos.
+        Cada parte se copia del mapeo recién al pedirla, así la memoria no depende del rango.
+        """
+        segments = self._segments(crypto_id)
+
+        for i, (first, path) in enumerate(segments):
+            following = segments[i + 1][0] if i + 1 < len(segments) else None
+
+            if first > end or (following is not None and following <= start):
+                continue
+
+            yield from self._iter_segment(crypto_id, path, start, end, chunk_size)
+
+    def _iter_segment(
+        self, crypto_id: str, path: str, start: int, end: int, chunk_size: int
+    ) -> Iterator[HistorySeries]:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            size -= size % HISTORY_RECORD.size
+
+            if not size:
+                return
+
+            with (
+                mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as mm,
+                memoryview(mm) as words,
+                words.cast("q") as ts_words,
+                words.cast("d") as price_words,
+            ):
+                ts_column, price_column = ts_words[0::2], price_words[1::2]
+
+                try:
+                    lo = bisect.bisect_left(ts_column, start)
+                    hi = bisect.bisect_right(ts_column, end)
+
+                    for offset in range(lo, hi, chunk_size):
+                        limit = min(offset + chunk_size, hi)
+                        chunk = HistorySeries(id=crypto_id)
+                        chunk.timestamps.frombytes(ts_column[offset:limit].tobytes())
+                        chunk.prices.frombytes(price_column[offset:limit].tobytes())
+
+                        if sys.byteorder != "little":
+                            chunk.timestamps.byteswap()
+                            chunk.prices.byteswap()
+
+                        yield chunk
+                finally:
+                    # Las vistas deben liberarse antes de cerrar el mapeo, aunque se corte la iteración
+                    ts_column.release()
+                    price_column.release()
+
+
+def history_store_from_env() -> SegmentHistoryStore | None:
+    """
+    Backend del historial según RPC_INFO_HISTORY_BACKEND: None para Redis.
+    """
+    if ProjectEnv.RPC_INFO_HISTORY_BACKEND == "segments":
+        return SegmentHistoryStore(SEGMENTS_DIR)
+
+    return None
@@ -4,18 +4,26 @@ import time
 import grpc
 import logging
 import asyncio
+import functools
 from concurrent import futures
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from utils import ProjectEnv
 from generated import crypto_pb2, crypto_pb2_grpc
-from cache import DataCache
+from async_cache import AsyncDataCache
+from notifications import CryptoUpdates
+from stream_hub import StreamHub
+from response_cache import ResponseCache
+from segment_store import history_store_from_env
 from currency_exchange import get_exchanges
 from data_handle import (
     get_cryptos_data,
     get_crypto_data,
     get_history_data,
+    get_history_range,
+    get_history_batch,
+    stream_history_range,
 )
 
 
@@ -26,10 +34,36 @@ logging.basicConfig(
 log = logging.getLogger(__name__)
 
 
+def reports_staleness(handler):
+    """
+    Si la respuesta salió del snapshot local porque Redis no responde, lo indica en la
+    metadata final con x-stale-seconds (segundos desde la última lectura exitosa).
+    """
+
+    @functools.wraps(handler)
+    async def wrapper(self, request, context):
+        response = await handler(self, request, context)
+        stale = AsyncDataCache().stale_for
+
+        if stale is not None:
+            context.set_trailing_metadata((("x-stale-seconds", f"{stale:.0f}"),))
+
+        return response
+
+    return wrapper
+
+
 class CryptoService(crypto_pb2_grpc.CryptoServiceServicer):
+    def __init__(self, updates: CryptoUpdates | None = None):
+        self.updates = updates or CryptoUpdates()
+        self.hub = StreamHub(self.updates)
+        self.responses = ResponseCache()
+
     async def StreamTopCryptos(self, request, context):
         """
         Transmite las principales criptomonedas en una divisa específica, ordenadas por capitalización de mercado descendente.
+        Envía el snapshot actual al conectarse y uno nuevo apenas el worker confirma cada tick.
+        Los streams con la misma divisa y cantidad comparten un mensaje ya serializado.
         La transmisión continuará hasta que se detenga el servidor.
 
         args:
@@ -40,80 +74,240 @@ class CryptoService(crypto_pb2_grpc.CryptoServiceServicer):
             Una lista CryptoList con las principales criptomonedas en la divisa especificada.
         """
         try:
-            while not context.done():
-                log.info("Transmitiendo criptomonedas...")
+            self.updates.start()
 
-                data = get_cryptos_data(request.currency, request.quantity)
-                yield crypto_pb2.CryptoList(cryptos=[c.to_proto() for c in data])
-                await asyncio.sleep(30)
+            async for message in self.hub.subscribe(request.currency, request.quantity):
+                if context.done():
+                    break
+
+                yield message
 
             log.info("Cliente desconectado del stream.")
         except Exception as e:
             log.error(f"Error en StreamTopCryptos: \n{e}")
 
+    async def StreamTopCryptosDelta(self, request, context):
+        """
+        Igual que StreamTopCryptos, pero después del snapshot inicial solo envía las criptos
+        y campos que cambiaron. Cada CryptoUpdate trae un número de secuencia; si el cliente
+        detecta un salto debe volver a suscribirse para recibir un snapshot nuevo.
+        """
+        try:
+            self.updates.start()
+
+            async for message in self.hub.subscribe(
+                request.currency, request.quantity, delta=True
+            ):
+                if context.done():
+                    break
+
+                yield message
+
+            log.info("Cliente desconectado del stream con deltas.")
+        except Exception as e:
+            log.error(f"Error en StreamTopCryptosDelta: \n{e}")
+
+    @reports_staleness
     async def GetPriceHistory(self, request, context):
         try:
             log.info(f"Obteniendo historial de precios {request}")
 
-            history = get_history_data(
+            history = await get_history_data(
                 crypto_id=request.id,
                 history_size=request.history_size,
                 target_currency=request.currency,
             )
 
-            # Convertir los puntos de dict a Proto
-            proto_prices = [
-                crypto_pb2.HistoricalPricePoint(timestamp=p.timestamp, price=p.price)
-                for p in history
-            ]
-
-            return crypto_pb2.HistoricalResponse(id=request.id, prices=proto_prices)
+            # Los puntos se convierten a Proto solo al serializar
+            return history.to_proto(request.format)
         except Exception as e:
             log.error(f"Error al obtener datos de criptomonedas: \n{e}")
             return crypto_pb2.HistoricalResponse()
 
+    @reports_staleness
+    async def GetPriceHistoryRange(self, request, context):
+        """
+        Historial de precios entre dos timestamps, reducido en el servidor a max_points
+        usando rollups o LTTB, así el tamaño de la respuesta no depende del rango.
+        """
+        try:
+            log.info(f"Obteniendo historial de precios por rango {request}")
+
+            history = await get_history_range(
+                crypto_id=request.id,
+                start=request.start,
+                end=request.end,
+                max_points=request.max_points,
+                target_currency=request.currency,
+            )
+
+            return history.to_proto(request.format)
+        except Exception as e:
+            log.error(f"Error al obtener historial por rango: \n{e}")
+            return crypto_pb2.HistoricalResponse()
+
+    async def StreamPriceHistory(self, request, context):
+        """
+        Exporta el historial crudo de un rango en mensajes de chunk_size puntos.
+        Cada parte se lee del historial justo antes de enviarla y el control de flujo de
+        gRPC pausa la lectura si el cliente va lento, así la memoria no crece con el rango.
+        Si falla a mitad de camino el stream termina con error, no truncado en silencio.
+        """
+        try:
+            log.info(f"Exportando historial de precios {request}")
+
+            async for chunk in stream_history_range(
+                crypto_id=request.id,
+                start=request.start,
+                end=request.end,
+                chunk_size=request.chunk_size,
+                target_currency=request.currency,
+            ):
+                if context.done():
+                    break
+
+                yield chunk.to_proto(request.format)
+        except ValueError as e:
+            log.error(f"Error en StreamPriceHistory: \n{e}")
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details(str(e))
+        except Exception as e:
+            log.error(f"Error en StreamPriceHistory: \n{e}")
+            context.set_code(grpc.StatusCode.UNAVAILABLE)
+            context.set_details("No se pudo leer el historial")
+
+    @reports_staleness
+    async def GetPriceHistoryBatch(self, request, context):
+        """
+        Historial de varias criptos en una sola lectura del caché.
+        """
+        try:
+            log.info(f"Obteniendo historial de precios de {len(request.ids)} criptos")
+
+            histories = await get_history_batch(
+                crypto_ids=list(request.ids),
+                history_size=request.history_size,
+                target_currency=request.currency,
+            )
+
+            return crypto_pb2.HistoricalBatchResponse(
+                histories={i: h.to_proto(request.format) for i, h in histories.items()}
+            )
+        except Exception as e:
+            log.error(f"Error al obtener historial de varias criptos: \n{e}")
+            return crypto_pb2.HistoricalBatchResponse()
+
+    @reports_staleness
     async def GetTopCryptos(self, request, context):
         log.info(f"Obteniendo criptomonedas {request}")
 
         try:
-            data = get_cryptos_data(request.currency, request.quantity)
-            return crypto_pb2.CryptoList(cryptos=[c.to_proto() for c in data])
+            key = ("GetTopCryptos", request.currency.lower(), request.quantity)
+            version = await self.responses.version()
+            cached = self.responses.get(key, version)
+
+            if cached is not None:
+                return cached
+
+            data = await get_cryptos_data(request.currency, request.quantity)
+            return self.responses.put(
+                key, version, crypto_pb2.CryptoList(cryptos=[c.to_proto() for c in data])
+            )
         except Exception as e:
             log.error(f"Error al obtener datos de criptomonedas: \n{e}")
             return crypto_pb2.CryptoList(cryptos=[])
 
+    @reports_staleness
     async def GetCryptoById(self, request, context):
         log.info(f"Obteniendo criptomonedas {request}")
 
         try:
-            data = get_crypto_data(request.id, request.currency)
-            return data.to_proto()
+            key = ("GetCryptoById", request.id, request.currency.lower())
+            version = await self.responses.version()
+            cached = self.responses.get(key, version)
+
+            if cached is not None:
+                return cached
+
+            data = await get_crypto_data(request.id, request.currency)
+
+            if data is None:
+                context.set_code(grpc.StatusCode.NOT_FOUND)
+                context.set_details(f"No se encontraron datos para la cripto {request.id}")
+                return crypto_pb2.Crypto()
+
+            return self.responses.put(key, version, data.to_proto())
         except Exception as e:
             log.error(f"Error al obtener datos de criptomonedas: \n{e}")
             return crypto_pb2.Crypto()
 
+    @reports_staleness
     async def GetExchangeRates(self, request, context):
         log.info(f"Obteniendo cambio de divisas {request}")
 
         try:
-            data = [r.to_proto() for r in get_exchanges()]
-            return crypto_pb2.ExchangeRates(rates=data)
+            key = ("GetExchangeRates",)
+            version = await self.responses.version()
+            cached = self.responses.get(key, version)
+
+            if cached is not None:
+                return cached
+
+            data = [r.to_proto() for r in await get_exchanges()]
+            return self.responses.put(key, version, crypto_pb2.ExchangeRates(rates=data))
         except Exception as e:
             log.error(f"Error al obtener datos de criptomonedas: \n{e}")
             return crypto_pb2.ExchangeRates()
 
 
+def _serialize(message) -> bytes:
+    # Los mensajes pre-serializados (bytes) se envían sin volver a serializar
+    return message if isinstance(message, bytes) else message.SerializeToString()
+
+
+def register_service(server, servicer: CryptoService):
+    """
+    Igual que crypto_pb2_grpc.add_CryptoServiceServicer_to_server, pero los handlers
+    pueden retornar bytes de un mensaje ya serializado además del mensaje Proto.
+    """
+    service = crypto_pb2.DESCRIPTOR.services_by_name["CryptoService"]
+    handlers = {}
+
+    for method in service.methods:
+        if method.server_streaming:
+            handler = grpc.unary_stream_rpc_method_handler
+        else:
+            handler = grpc.unary_unary_rpc_method_handler
+
+        handlers[method.name] = handler(
+            getattr(servicer, method.name),
+            request_deserializer=getattr(crypto_pb2, method.input_type.name).FromString,
+            response_serializer=_serialize,
+        )
+
+    server.add_generic_rpc_handlers(
+        (grpc.method_handlers_generic_handler(service.full_name, handlers),)
+    )
+    server.add_registered_method_handlers(service.full_name, handlers)
+
+
 async def serve():
     log.info("Iniciando el servidor...")
 
-    cache = DataCache(
-        host=ProjectEnv.RPC_INFO_REDIS_HOST, port=ProjectEnv.RPC_INFO_REDIS_PORT
+    cache = AsyncDataCache(
+        host=ProjectEnv.RPC_INFO_REDIS_HOST,
+        port=ProjectEnv.RPC_INFO_REDIS_PORT,
+        history_store=history_store_from_env(),
     )
 
+    # Una sola suscripción a las notificaciones del worker para todos los streams
+    updates = CryptoUpdates(cache)
+    updates.start()
+
     # Comenzar servidor gRPC
     server = grpc.aio.server()
     # server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
-    crypto_pb2_grpc.add_CryptoServiceServicer_to_server(CryptoService(), server)
+    register_service(server, CryptoService(updates))
 
     server.add_insecure_port(ProjectEnv.RPC_INFO)
     await server.start()
@@ -124,7 +318,8 @@ async def serve():
         await server.wait_for_termination()
     finally:
         log.info("Ctrl+C detectado. Cerrando servidor...")
-        cache.close()
+        await updates.stop()
+        await cache.close()
         await server.stop(grace=None)
         print("\n--- PROCESO FINALIZADO ---")
 
@@ -0,0 +1,163 @@
+"""
+Difusión compartida para StreamTopCryptos y StreamTopCryptosDelta.
+
+Todas las suscripciones con la misma (divisa, cantidad, modo) comparten un productor: una
+tarea que por cada tick convierte la divisa, arma el mensaje y lo serializa una sola vez.
+Cada suscriptor recibe los bytes en una cola acotada; si un cliente lento la llena se
+descarta el mensaje más viejo, ya que cada mensaje es un snapshot completo. En modo delta
+se reemplaza la cola por el snapshot actual, así el cliente se resincroniza solo.
+El productor se detiene cuando se va su último suscriptor.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import AsyncIterator
+
+from generated import crypto_pb2
+from models import CryptoCurrency
+from data_handle import convert_cryptos
+from notifications import CryptoUpdates
+
+log = logging.getLogger(__name__)
+
+SUBSCRIBER_QUEUE_SIZE = 4
+
+
+@dataclass
+class _Topic:
+    delta: bool = False
+    subscribers: set = field(default_factory=set)
+    latest: bytes | None = None  # Último snapshot completo, para quien se suscribe entre ticks
+    task: asyncio.Task | None = None
+
+    # Solo en modo delta: estado enviado en el último mensaje
+    sequence: int = 0
+    previous: dict[str, CryptoCurrency] = field(default_factory=dict)
+    order: list[str] = field(default_factory=list)
+
+
+class StreamHub:
+    def __init__(self, updates: CryptoUpdates, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.updates = updates
+        self.queue_size = queue_size
+        self._topics: dict[tuple[str, int], _Topic] = {}
+
+    def stats(self) -> dict:
+        return {
+            f"{currency}:{quantity}{':delta' if delta else ''}": len(topic.subscribers)
+            for (currency, quantity, delta), topic in self._topics.items()
+        }
+
+    async def subscribe(
+        self, currency: str, quantity: int, delta: bool = False
+    ) -> AsyncIterator[bytes]:
+        """
+        Entrega mensajes ya serializados para (currency, quantity):
+        CryptoList, o CryptoUpdate si `delta` es True.
+        """
+        key = (currency.lower(), quantity, delta)
+        topic = self._topics.get(key)
+
+        if topic is None:
+            topic = self._topics[key] = _Topic(delta=delta)
+            topic.task = asyncio.create_task(self._produce(key, topic))
+            log.info(f"Productor iniciado para {key}")
+
+        queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=self.queue_size)
+        topic.subscribers.add(queue)
+
+        if topic.latest is not None:
+            queue.put_nowait(topic.latest)
+
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            topic.subscribers.discard(queue)
+
+            if not topic.subscribers and self._topics.get(key) is topic:
+                del self._topics[key]
+                topic.task.cancel()
+                log.info(f"Productor detenido para {key}")
+
+    async def _produce(self, key: tuple[str, int, bool], topic: _Topic):
+        currency, quantity, _ = key
+
+        async for snapshot in self.updates.subscribe():
+            try:
+                data = await convert_cryptos(snapshot, currency, quantity)
+
+                if topic.delta:
+                    message, full = _delta_messages(topic, data)
+                else:
+                    message = full = crypto_pb2.CryptoList(
+                        cryptos=[c.to_proto() for c in data]
+                    ).SerializeToString()
+            except Exception as e:
+                log.error(f"Error en el productor {key}: {e}")
+                continue
+
+            if message is None:
+                continue
+
+            topic.latest = full
+
+            for queue in topic.subscribers:
+                _offer(queue, message, resync=full if topic.delta else None)
+
+
+def _delta_messages(
+    topic: _Topic, data: list[CryptoCurrency]
+) -> tuple[bytes | None, bytes | None]:
+    """
+    Arma el CryptoUpdate con los cambios respecto al tick anterior y el snapshot completo
+    con la misma secuencia. Retorna (None, None) si nada cambió.
+    """
+    order = [c.id for c in data]
+    ids = set(order)
+    first = not topic.previous
+
+    changed = [c.to_delta_proto(topic.previous.get(c.id)) for c in data]
+    changed = [d for d in changed if d is not None]
+    removed = [i for i in topic.previous if i not in ids]
+
+    if not first and not changed and not removed and order == topic.order:
+        return None, None
+
+    topic.sequence += 1
+    full = crypto_pb2.CryptoUpdate(
+        sequence=topic.sequence,
+        snapshot=True,
+        cryptos=[c.to_delta_proto() for c in data],
+        order=order,
+    ).SerializeToString()
+
+    if first:
+        message = full
+    else:
+        message = crypto_pb2.CryptoUpdate(
+            sequence=topic.sequence,
+            cryptos=changed,
+            removed=removed,
+            order=order if order != topic.order else [],
+        ).SerializeToString()
+
+    topic.previous = {c.id: c for c in data}
+    topic.order = order
+    return message, full
+
+
+def _offer(queue: asyncio.Queue, message: bytes, resync: bytes | None = None):
+    if queue.full():
+        if resync is None:
+            queue.get_nowait()
+        else:
+            # Un delta perdido rompe la cadena: se reemplaza todo por el snapshot actual
+            while not queue.empty():
+                queue.get_nowait()
+
+            queue.put_nowait(resync)
+            return
+
+    queue.put_nowait(message)
@@ -2,7 +2,8 @@
 Workers en segundo plano para actualizar los datos de criptomonedas
 
 Permite tener solo una instancia para obtener los datos.
-Permite que N servidores obtengan los datos de criptomonedas en segundo plano sin problemas de condiciones de carrera
+Se pueden levantar N instancias: solo la que tiene el lease de líder (leader.py) consulta
+las APIs externas, las demás quedan en espera y toman el control si el líder se cae.
 """
 
 import os
@@ -14,6 +15,10 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from utils import ProjectEnv
 from cache import DataCache
+from leader import LeaderLease
+from http_client import close_client
+from history_snapshot import history_snapshot_worker
+from segment_store import history_store_from_env
 from data_handle import crypto_data_worker
 from currency_exchange import currency_exchange_worker
 
@@ -28,12 +33,31 @@ async def start_workers():
     cache = DataCache(
         host=ProjectEnv.RPC_INFO_REDIS_HOST,
         port=ProjectEnv.RPC_INFO_REDIS_PORT,
+        history_store=history_store_from_env(),
     )
 
-    try:
-        asyncio.create_task(crypto_data_worker(interval=30))
-        asyncio.create_task(currency_exchange_worker(interval=600))
+    lease = LeaderLease(cache)
+    tasks = [
+        asyncio.create_task(lease.run()),
+        asyncio.create_task(crypto_data_worker(lease=lease)),
+        asyncio.create_task(currency_exchange_worker(lease=lease)),
+    ]
+
+    # Con el backend de segmentos el historial ya vive en disco
+    if cache.history_store is None:
+        # Migrar el historial del formato antiguo (lista de snapshots) si existe.
+        # Si Redis no responde se omite: la migración se reintenta en el próximo arranque
+        try:
+            migrated = cache.migrate_legacy_history()
+            if migrated:
+                logging.info(f"Historial antiguo migrado ({migrated} puntos).")
+        except Exception as e:
+            logging.error(f"No se pudo migrar el historial antiguo: {e}")
+
+        # El worker restaura el último snapshot en disco apenas esta instancia sea líder
+        tasks.append(asyncio.create_task(history_snapshot_worker(lease=lease)))
 
+    try:
         logging.info("Workers iniciados.")
 
         # Esperar indefinidamente
@@ -42,6 +66,13 @@ async def start_workers():
         logging.info("Workers detenidos.")
     finally:
         logging.info("Cerrando workers...")
+
+        for task in tasks:
+            task.cancel()
+
+        # Liberar el lease para que una instancia en espera tome el control de inmediato
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await close_client()
         cache.close()
 
     logging.info("Workers finalizados.")
@@ -8,7 +8,9 @@ import logging
 import asyncio
 from typing import Optional
 
-from models import CryptoCurrency, CryptoHistoryItem
+from generated import crypto_pb2
+from models import CryptoCurrency, HistorySeries
+from utils import CryptoDeltaState
 
 log = logging.getLogger(__name__)
 
@@ -99,12 +101,11 @@ class SocketConnection:
                 # Obtener historial real inmediatamente al unirse
                 try:
                     response = await self.rpc.get_price_history(
-                        id=room, history_size=50
+                        id=room,
+                        history_size=50,
+                        history_format=crypto_pb2.HISTORY_COLUMNS_DELTA,
                     )
-                    data = [
-                        CryptoHistoryItem.from_proto(response.id, h).to_dict()
-                        for h in response.prices
-                    ]
+                    data = HistorySeries.from_proto(response).to_dicts()
                     await self.sio.emit("crypto_update", {"data": data}, to=sid)
                     log.info(f"Enviado historial de {room} a {sid} ({len(data)} items)")
                 except Exception as e:
@@ -145,23 +146,35 @@ class SocketConnection:
                 for room in list(self.active_rooms.keys()):
                     if self.active_rooms[room] <= 0:
                         del self.active_rooms[room]
-                        continue
 
+                rooms = list(self.active_rooms.keys())
+
+                if rooms:
                     try:
-                        response = await self.rpc.get_price_history(
-                            id=room, history_size=50
+                        # Una sola llamada para el historial de todas las salas
+                        response = await self.rpc.get_price_history_batch(
+                            ids=rooms,
+                            history_size=50,
+                            history_format=crypto_pb2.HISTORY_COLUMNS_DELTA,
                         )
 
-                        data = [
-                            CryptoHistoryItem.from_proto(response.id, h).to_dict()
-                            for h in response.prices
-                        ]
-
-                        await self.sio.emit("crypto_update", {"data": data}, room=room)
-                        log.info(f"crypto_update → sala '{room}' ({len(data)} items)")
+                        for room in rooms:
+                            history = response.histories.get(room)
+                            data = (
+                                HistorySeries.from_proto(history).to_dicts()
+                                if history
+                                else []
+                            )
+
+                            await self.sio.emit(
+                                "crypto_update", {"data": data}, room=room
+                            )
+                            log.info(
+                                f"crypto_update → sala '{room}' ({len(data)} items)"
+                            )
 
                     except Exception as e:
-                        log.error(f"Error polling sala {room}: {e}")
+                        log.error(f"Error polling salas {rooms}: {e}")
 
                 await asyncio.sleep(10)
 
@@ -179,31 +192,45 @@ class SocketConnection:
         """
         try:
             log.info("Iniciando stream de criptomonedas...")
-            stream = self.rpc.stream_top_cryptos(quantity=50)
 
-            async for update in stream:
-                cryptos = [
-                    CryptoCurrency.from_proto(c).to_dict() for c in update.cryptos
-                ]
+            # Stream con deltas: el servidor solo envía criptos y campos que cambiaron
+            state = CryptoDeltaState()
 
-                # Actualizar cache
-                self.cached_top5 = cryptos[:5]
+            while True:
+                stream = self.rpc.stream_top_cryptos_delta(quantity=50)
 
-                # Actualizar cache de top50 (dict para búsqueda rápida)
-                for crypto in cryptos:
-                    self.cached_top50[crypto["id"]] = crypto
+                async for update in stream:
+                    if not state.apply(update):
+                        # Se perdió un mensaje: volver a suscribirse para recibir un snapshot
+                        log.warning(
+                            f"Salto en la secuencia ({state.sequence} -> {update.sequence}), resincronizando"
+                        )
+                        stream.cancel()
+                        break
 
-                log.info(f"Broadcasting {len(cryptos)} cryptos")
+                    cryptos = [c.to_dict() for c in state.to_list()]
 
-                # Top 5: Broadcast a TODOS
-                await self.sio.emit("top5_update", {"cryptos": cryptos[:5]})
+                    # Actualizar cache
+                    self.cached_top5 = cryptos[:5]
 
-                # Top 50: Solo a suscritos
-                await self.sio.emit(
-                    "top50_update", {"cryptos": cryptos}, room="top50_subscribers"
-                )
+                    # Actualizar cache de top50 (dict para búsqueda rápida)
+                    for crypto in cryptos:
+                        self.cached_top50[crypto["id"]] = crypto
+
+                    log.info(f"Broadcasting {len(cryptos)} cryptos")
+
+                    # Top 5: Broadcast a TODOS
+                    await self.sio.emit("top5_update", {"cryptos": cryptos[:5]})
+
+                    # Top 50: Solo a suscritos
+                    await self.sio.emit(
+                        "top50_update", {"cryptos": cryptos}, room="top50_subscribers"
+                    )
 
-                log.info(f"Enviado top5 (broadcast) y top50 (sala)")
+                    log.info(f"Enviado top5 (broadcast) y top50 (sala)")
+                else:
+                    # El servidor cerró el stream
+                    break
 
         except asyncio.CancelledError:
             log.info("Stream cancelado")
@@ -1,4 +1,4 @@
 from .env import ProjectEnv
-from .rpc_info_client import RpcInfoClient
+from .rpc_info_client import RpcInfoClient, CryptoDeltaState
 from .rpc_report_client import RpcReportClient
 from .rpc_email_client import RpcEmailClient
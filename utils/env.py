@@ -8,6 +8,22 @@ class ProjectEnv:
     RPC_INFO = os.getenv("RPC_INFO", "127.0.0.1:50051")
     RPC_INFO_REDIS_HOST = os.getenv("RPC_INFO_REDIS_HOST", "127.0.0.1")
     RPC_INFO_REDIS_PORT = os.getenv("RPC_INFO_REDIS_PORT", 6380)
+    # json | binary (registros empaquetados int64 timestamp + float64 precio)
+    RPC_INFO_HISTORY_ENCODING = os.getenv("RPC_INFO_HISTORY_ENCODING", "json")
+    # Conexiones máximas del pool asíncrono de Redis en rpc_info/server.py
+    RPC_INFO_REDIS_POOL_SIZE = os.getenv("RPC_INFO_REDIS_POOL_SIZE", 20)
+    # Presupuesto de peticiones por minuto a CoinGecko (plan público ~10, Demo 30)
+    RPC_INFO_COINGECKO_RPM = os.getenv("RPC_INFO_COINGECKO_RPM", 10)
+    # Top N criptos por market cap que se ingieren en cada tick (páginas de hasta 250)
+    RPC_INFO_COVERAGE = os.getenv("RPC_INFO_COVERAGE", 50)
+    # Divisas cuyos precios se precalculan en cada tick, separadas por coma
+    RPC_INFO_HOT_CURRENCIES = os.getenv("RPC_INFO_HOT_CURRENCIES", "eur,cop,mxn,gbp,jpy")
+    # Archivo del snapshot del historial (por defecto rpc_info/data/history.snap)
+    RPC_INFO_HISTORY_SNAPSHOT = os.getenv("RPC_INFO_HISTORY_SNAPSHOT", None)
+    # Backend del historial crudo: redis | segments (archivos append-only en disco)
+    RPC_INFO_HISTORY_BACKEND = os.getenv("RPC_INFO_HISTORY_BACKEND", "redis")
+    # Directorio de los segmentos (por defecto rpc_info/data/segments)
+    RPC_INFO_HISTORY_SEGMENTS_DIR = os.getenv("RPC_INFO_HISTORY_SEGMENTS_DIR", None)
 
     RPC_REPORT = os.getenv("RPC_REPORT", "127.0.0.1:50052")
 
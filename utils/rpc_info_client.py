@@ -8,9 +8,51 @@ from collections import defaultdict
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from generated import crypto_pb2, crypto_pb2_grpc
+from models import CryptoCurrency
 from utils import ProjectEnv
 
 
+class CryptoDeltaState:
+    """
+    Estado del cliente para StreamTopCryptosDelta: aplica cada CryptoUpdate recibido.
+    """
+
+    def __init__(self):
+        self.sequence = 0
+        self.order: list[str] = []
+        self.cryptos: dict[str, CryptoCurrency] = {}
+
+    def apply(self, update) -> bool:
+        """
+        Aplica un CryptoUpdate. Retorna False si hay un salto en la secuencia;
+        en ese caso el estado no cambia y se debe volver a suscribir.
+        """
+        if update.snapshot:
+            self.cryptos = {c.id: CryptoCurrency.from_proto(c) for c in update.cryptos}
+        elif update.sequence != self.sequence + 1:
+            return False
+        else:
+            for delta in update.cryptos:
+                current = self.cryptos.get(delta.id)
+                self.cryptos[delta.id] = (
+                    current.apply_delta(delta)
+                    if current
+                    else CryptoCurrency.from_proto(delta)
+                )
+
+            for crypto_id in update.removed:
+                self.cryptos.pop(crypto_id, None)
+
+        if update.order:
+            self.order = list(update.order)
+
+        self.sequence = update.sequence
+        return True
+
+    def to_list(self) -> list[CryptoCurrency]:
+        return [self.cryptos[i] for i in self.order if i in self.cryptos]
+
+
 class RpcInfoClient:
     def __init__(self, async_mode=False):
         """
@@ -34,16 +76,93 @@ class RpcInfoClient:
         request = crypto_pb2.CryptoByIdRequest(id=id, currency=currency)
         return self.stub.GetCryptoById(request)
 
-    def get_price_history(self, id: str, currency: str = "usd", history_size: int = 5):
+    def get_price_history(
+        self,
+        id: str,
+        currency: str = "usd",
+        history_size: int = 5,
+        history_format=crypto_pb2.HISTORY_POINTS,
+    ):
+        """
+        Con history_format HISTORY_COLUMNS o HISTORY_COLUMNS_DELTA la respuesta trae
+        `columns` en vez de `prices`; HistorySeries.from_proto lee cualquiera de los dos.
+        """
         request = crypto_pb2.HistoricalRequest(
-            id=id, currency=currency, history_size=history_size
+            id=id, currency=currency, history_size=history_size, format=history_format
         )
         return self.stub.GetPriceHistory(request)
 
+    def get_price_history_batch(
+        self,
+        ids: list[str],
+        currency: str = "usd",
+        history_size: int = 5,
+        history_format=crypto_pb2.HISTORY_POINTS,
+    ):
+        """
+        Historial de varias criptos en una sola llamada.
+        La respuesta tiene `histories`: un map de id -> HistoricalResponse.
+        En modo asíncrono retorna una coroutine.
+        """
+        request = crypto_pb2.HistoricalBatchRequest(
+            ids=ids, currency=currency, history_size=history_size, format=history_format
+        )
+        return self.stub.GetPriceHistoryBatch(request)
+
+    def get_price_history_range(
+        self,
+        id: str,
+        currency: str = "usd",
+        start: int = 0,
+        end: int = 0,
+        max_points: int = 200,
+        history_format=crypto_pb2.HISTORY_POINTS,
+    ):
+        request = crypto_pb2.HistoricalRangeRequest(
+            id=id,
+            currency=currency,
+            start=start,
+            end=end,
+            max_points=max_points,
+            format=history_format,
+        )
+        return self.stub.GetPriceHistoryRange(request)
+
+    def stream_price_history(
+        self,
+        id: str,
+        currency: str = "usd",
+        start: int = 0,
+        end: int = 0,
+        chunk_size: int = 1000,
+        history_format=crypto_pb2.HISTORY_COLUMNS_DELTA,
+    ):
+        """
+        Stream de HistoricalResponse con el historial crudo del rango, de a chunk_size puntos.
+        Sirve para exportar rangos largos sin esperar ni cargar la respuesta completa.
+        """
+        request = crypto_pb2.HistoricalStreamRequest(
+            id=id,
+            currency=currency,
+            start=start,
+            end=end,
+            chunk_size=chunk_size,
+            format=history_format,
+        )
+        return self.stub.StreamPriceHistory(request)
+
     def stream_top_cryptos(self, currency: str = "usd", quantity: int = 5):
         request = crypto_pb2.CryptoRequest(currency=currency, quantity=quantity)
         return self.stub.StreamTopCryptos(request)
 
+    def stream_top_cryptos_delta(self, currency: str = "usd", quantity: int = 5):
+        """
+        Stream de CryptoUpdate: snapshot inicial y luego solo cambios.
+        Usar CryptoDeltaState para reconstruir la lista.
+        """
+        request = crypto_pb2.CryptoRequest(currency=currency, quantity=quantity)
+        return self.stub.StreamTopCryptosDelta(request)
+
     def get_exchanges(self):
         return self.stub.GetExchangeRates(crypto_pb2.Empty())
 